@@ -1,14 +1,39 @@
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
+from tkinter import ttk, filedialog, messagebox
 import threading
+import queue
 import os
-import re
-from urllib.parse import urlparse, parse_qs
-import yt_dlp
-from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound, TranscriptsDisabled
-from youtube_transcript_api.formatters import TextFormatter
+import json
 import time
-import requests
+import logging
+import contextlib
+import transcript_core
+from transcript_core import TranscriptFetcher, DEFAULT_MAX_WORKERS
+from transcript_formats import FORMATS, DEFAULT_FORMAT
+from search_index import INDEX_FILENAME
+from job_journal import JobJournal
+from file_naming import NAMING_SCHEMES, DEFAULT_NAMING
+from playlist_snapshots import PlaylistSnapshots, changed_ids, describe_changes
+from transcript_postprocess import MERGE_MODES, DEFAULT_MERGE
+from instrumentation import configure_logging, profiled, DEFAULT_LOG_LEVEL, LOG_LEVEL_ENV_VAR, PROFILE_ENV_VAR
+
+logger = logging.getLogger(__name__)
+
+# Status label colour for each transcript_core status level
+STATUS_COLORS = {
+    transcript_core.STATUS_INFO: "black",
+    transcript_core.STATUS_WORKING: "blue",
+    transcript_core.STATUS_WARNING: "orange",
+    transcript_core.STATUS_ERROR: "red",
+    transcript_core.STATUS_SUCCESS: "green",
+}
+
+CHECKED = "\u2611"
+UNCHECKED = "\u2610"
+SHIFT_MASK = 0x0001
+# Worker status, progress and status-label updates are applied at most this often
+UI_FRAME_MS = 100
+WORKER_THREAD_PREFIX = "transcript"
 
 class YouTubeTranscriptExtractor:
     def __init__(self, root):
@@ -21,10 +46,37 @@ class YouTubeTranscriptExtractor:
         self.output_dir = tk.StringVar()
         self.playlist_url = tk.StringVar()
         self.videos = []
-        self.video_vars = []
+        # Videos added or renamed since the playlist's previous snapshot
+        self.changed_ids = set()
+        # One byte per video (1 = selected) instead of a Tk variable per row
+        self.selected = bytearray()
+        self.visible_indices = []
+        self.last_clicked = None
+        self.filter_text = tk.StringVar()
         self.is_fetching = False
+        # The running TranscriptFetcher, so Cancel and closing the window can stop it
+        self.fetcher = None
+        self.max_workers = tk.IntVar(value=DEFAULT_MAX_WORKERS)
+        self.bypass_cache = tk.BooleanVar(value=False)
+        self.sync_mode = tk.BooleanVar(value=False)
+        self.output_format = tk.StringVar(value=DEFAULT_FORMAT)
+        self.naming = tk.StringVar(value=DEFAULT_NAMING)
+        self.merge = tk.StringVar(value=DEFAULT_MERGE)
+        self.build_index = tk.BooleanVar(value=False)
+        self.archive_output = tk.BooleanVar(value=False)
+        
+        # One-off callbacks posted by worker threads, drained on the Tk main thread
+        self.ui_queue = queue.Queue()
+        # Latest status/progress/per-worker state; only the newest value per frame is drawn
+        self._ui_lock = threading.Lock()
+        self._pending_status = None
+        self._pending_progress = None
+        self._pending_workers = {}
+        self.worker_rows = {}
         
         self.setup_gui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(UI_FRAME_MS, self._process_ui_queue)
         
     def setup_gui(self):
         """Set up the main GUI interface"""
@@ -64,6 +116,8 @@ class YouTubeTranscriptExtractor:
         
         ttk.Button(url_frame, text="Load Playlist", command=self.load_playlist).grid(
             row=0, column=1)
+        ttk.Button(url_frame, text="Refresh", command=lambda: self.load_playlist(refresh=True)).grid(
+            row=0, column=2, padx=(5, 0))
         
         # Progress bar
         self.progress_var = tk.DoubleVar()
@@ -83,13 +137,39 @@ class YouTubeTranscriptExtractor:
         videos_frame = ttk.Frame(main_frame)
         videos_frame.grid(row=7, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 15))
         videos_frame.columnconfigure(0, weight=1)
-        videos_frame.rowconfigure(0, weight=1)
+        videos_frame.rowconfigure(1, weight=1)
         main_frame.rowconfigure(7, weight=1)
         
-        # Create scrollable text widget for videos
-        self.videos_text = scrolledtext.ScrolledText(
-            videos_frame, height=15, width=80, wrap=tk.WORD)
-        self.videos_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        # Filter box and selection summary
+        filter_frame = ttk.Frame(videos_frame)
+        filter_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        filter_frame.columnconfigure(1, weight=1)
+        
+        ttk.Label(filter_frame, text="Filter:").grid(row=0, column=0, padx=(0, 5))
+        ttk.Entry(filter_frame, textvariable=self.filter_text).grid(
+            row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 10))
+        self.selection_label = ttk.Label(filter_frame, text="No videos loaded")
+        self.selection_label.grid(row=0, column=2)
+        self.filter_text.trace_add('write', lambda *args: self.display_videos())
+        
+        # Treeview only draws the rows in view, so large playlists stay responsive
+        self.videos_tree = ttk.Treeview(
+            videos_frame, columns=('check', 'index', 'title'), show='headings',
+            height=15, selectmode='extended')
+        self.videos_tree.heading('check', text=CHECKED)
+        self.videos_tree.heading('index', text="#")
+        self.videos_tree.heading('title', text="Title")
+        self.videos_tree.column('check', width=40, anchor=tk.CENTER, stretch=False)
+        self.videos_tree.column('index', width=50, anchor=tk.E, stretch=False)
+        self.videos_tree.column('title', width=600)
+        self.videos_tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        tree_scrollbar = ttk.Scrollbar(videos_frame, orient=tk.VERTICAL, command=self.videos_tree.yview)
+        tree_scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        self.videos_tree.configure(yscrollcommand=tree_scrollbar.set)
+        
+        self.videos_tree.bind('<Button-1>', self._on_tree_click)
+        self.videos_tree.bind('<space>', self._toggle_highlighted)
         
         # Buttons frame
         buttons_frame = ttk.Frame(main_frame)
@@ -103,6 +183,13 @@ class YouTubeTranscriptExtractor:
             buttons_frame, text="Fetch Selected Transcripts", command=self.fetch_selected_transcripts)
         self.fetch_selected_btn.grid(row=0, column=1, padx=(10, 0))
         
+        self.resume_btn = ttk.Button(
+            buttons_frame, text="Resume Last Run", command=self.resume_last_run)
+        self.resume_btn.grid(row=0, column=2, padx=(20, 0))
+        
+        ttk.Button(buttons_frame, text="Cancel", command=self.cancel_fetch).grid(
+            row=0, column=3, padx=(10, 0))
+        
         # Select/Deselect all buttons
         select_frame = ttk.Frame(main_frame)
         select_frame.grid(row=9, column=0, columnspan=3, pady=(10, 0))
@@ -111,6 +198,67 @@ class YouTubeTranscriptExtractor:
             row=0, column=0, padx=(0, 10))
         ttk.Button(select_frame, text="Deselect All", command=self.deselect_all).grid(
             row=0, column=1, padx=(10, 0))
+        ttk.Button(select_frame, text="Select Changed", command=self.select_changed).grid(
+            row=0, column=2, padx=(20, 0))
+        
+        # Fetch options
+        options_frame = ttk.LabelFrame(main_frame, text="Options", padding="5")
+        options_frame.grid(row=10, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
+        
+        ttk.Label(options_frame, text="Workers:").grid(row=0, column=0, padx=(0, 5))
+        self.workers_spinbox = ttk.Spinbox(
+            options_frame, from_=1, to=32, width=4, textvariable=self.max_workers)
+        self.workers_spinbox.grid(row=0, column=1, padx=(0, 15))
+        
+        ttk.Checkbutton(options_frame, text="Bypass cache", variable=self.bypass_cache).grid(
+            row=0, column=2, padx=(0, 15))
+        
+        ttk.Checkbutton(
+            options_frame, text="Sync (only fetch new or changed videos)", variable=self.sync_mode
+        ).grid(row=0, column=3, padx=(0, 15))
+        
+        # Output options get their own row so the frame stays narrow
+        output_frame = ttk.Frame(options_frame)
+        output_frame.grid(row=1, column=0, columnspan=4, sticky=tk.W, pady=(5, 0))
+        
+        ttk.Label(output_frame, text="Format:").grid(row=0, column=0, padx=(0, 5))
+        ttk.Combobox(
+            output_frame, textvariable=self.output_format, values=list(FORMATS),
+            state='readonly', width=6
+        ).grid(row=0, column=1, padx=(0, 15))
+        
+        ttk.Label(output_frame, text="Names:").grid(row=0, column=2, padx=(0, 5))
+        ttk.Combobox(
+            output_frame, textvariable=self.naming, values=list(NAMING_SCHEMES),
+            state='readonly', width=8
+        ).grid(row=0, column=3, padx=(0, 15))
+        
+        ttk.Label(output_frame, text="Merge:").grid(row=0, column=4, padx=(0, 5))
+        ttk.Combobox(
+            output_frame, textvariable=self.merge, values=list(MERGE_MODES),
+            state='readonly', width=9
+        ).grid(row=0, column=5, padx=(0, 15))
+        
+        ttk.Checkbutton(output_frame, text="Build search index", variable=self.build_index).grid(
+            row=0, column=6, padx=(0, 15))
+        
+        ttk.Checkbutton(output_frame, text="Single archive file", variable=self.archive_output).grid(
+            row=0, column=7)
+        
+        # Live per-worker status
+        workers_frame = ttk.LabelFrame(main_frame, text="Workers", padding="5")
+        workers_frame.grid(row=11, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
+        workers_frame.columnconfigure(0, weight=1)
+        
+        self.workers_tree = ttk.Treeview(
+            workers_frame, columns=('worker', 'status'), show='headings', height=4, selectmode='none')
+        self.workers_tree.heading('worker', text="Worker")
+        self.workers_tree.heading('status', text="Status")
+        self.workers_tree.column('worker', width=80, stretch=False, anchor=tk.CENTER)
+        self.workers_tree.column('status', width=600)
+        self.workers_tree.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        for level, color in STATUS_COLORS.items():
+            self.workers_tree.tag_configure(level, foreground=color)
 
     def browse_directory(self):
         """Open file dialog to select output directory"""
@@ -118,158 +266,240 @@ class YouTubeTranscriptExtractor:
         if directory:
             self.output_dir.set(directory)
 
-    def extract_playlist_id(self, url):
-        """Extract playlist ID from YouTube URL"""
-        try:
-            print(f"[DEBUG] extract_playlist_id: Received URL: {url}")
-            parsed_url = urlparse(url)
-            print(f"[DEBUG] extract_playlist_id: Parsed netloc: {parsed_url.netloc}")
-            playlist_id_to_return = None
-            if 'youtube.com' in parsed_url.netloc:
-                query_params = parse_qs(parsed_url.query)
-                if 'list' in query_params:
-                    playlist_id_to_return = query_params['list'][0]
-            elif 'youtu.be' in parsed_url.netloc:
-                query_params = parse_qs(parsed_url.query)
-                if 'list' in query_params:
-                    playlist_id_to_return = query_params['list'][0]
-            print(f"[DEBUG] extract_playlist_id: Extracted ID: {playlist_id_to_return}")
-            return playlist_id_to_return
-        except Exception as e:
-            print(f"Error extracting playlist ID: {e}")
-            return None
+    def post_to_ui(self, callback, *args):
+        """Queue a callable to run on the Tk main thread"""
+        self.ui_queue.put((callback, args))
 
-    def sanitize_filename(self, filename):
-        """Remove or replace invalid characters for filenames"""
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '_')
-        
-        filename = re.sub(r'\s+', ' ', filename.strip())
-        if len(filename) > 100:
-            filename = filename[:100]
-        
-        return filename
+    def _process_ui_queue(self):
+        """Once per frame on the Tk main thread: run posted callbacks, then draw the latest state"""
+        try:
+            while True:
+                try:
+                    callback, args = self.ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+                # One failing callback must not take the rest of the frame down with it
+                try:
+                    callback(*args)
+                except Exception:
+                    logger.exception("UI callback %r failed", callback)
+            
+            with self._ui_lock:
+                status, self._pending_status = self._pending_status, None
+                progress, self._pending_progress = self._pending_progress, None
+                workers, self._pending_workers = self._pending_workers, {}
+            
+            if status is not None:
+                self._apply_status(*status)
+            if progress is not None:
+                self.progress_var.set(progress)
+            for worker, (message, level) in workers.items():
+                self._apply_worker_status(worker, message, level)
+        except Exception:
+            logger.exception("Could not update the UI")
+        finally:
+            # Always reschedule, or status, progress and dialogs would stop for the rest of the session
+            self.root.after(UI_FRAME_MS, self._process_ui_queue)
 
     def update_status(self, message, color="black"):
-        """Update status label"""
+        """Update status label (safe to call from worker threads)"""
+        with self._ui_lock:
+            self._pending_status = (message, color)
+
+    def _apply_status(self, message, color):
         self.status_label.config(text=message, foreground=color)
-        self.root.update_idletasks()
 
     def update_progress(self, value):
-        """Update progress bar"""
-        self.progress_var.set(value)
-        self.root.update_idletasks()
+        """Update progress bar (safe to call from worker threads)"""
+        with self._ui_lock:
+            self._pending_progress = value
 
-    def load_playlist(self):
-        """Load videos from YouTube playlist"""
+    def report_status(self, message, level):
+        """transcript_core status callback; also tracks which worker thread reported it"""
+        self.update_status(message, STATUS_COLORS.get(level, "black"))
+        worker = threading.current_thread().name
+        if worker.startswith(WORKER_THREAD_PREFIX):
+            with self._ui_lock:
+                self._pending_workers[worker] = (message, level)
+
+    def _apply_worker_status(self, worker, message, level):
+        row = self.worker_rows.get(worker)
+        # ThreadPoolExecutor names workers transcript_0, transcript_1, ...
+        label = f"#{int(worker.rsplit('_', 1)[-1]) + 1}" if worker[-1:].isdigit() else worker
+        if row is None:
+            self.worker_rows[worker] = self.workers_tree.insert(
+                '', tk.END, values=(label, message), tags=(level,))
+        else:
+            self.workers_tree.item(row, values=(label, message), tags=(level,))
+
+    def _reset_worker_table(self):
+        with self._ui_lock:
+            self._pending_workers = {}
+        self.workers_tree.delete(*self.workers_tree.get_children())
+        self.worker_rows = {}
+
+    def _mark_workers_idle(self):
+        with self._ui_lock:
+            self._pending_workers = {}
+        for row in self.worker_rows.values():
+            self.workers_tree.item(row, values=(self.workers_tree.set(row, 'worker'), "Idle"), tags=())
+
+    def load_playlist(self, refresh=False):
+        """Load videos from YouTube playlist; a recent snapshot is reused unless `refresh` is set"""
         if not self.playlist_url.get().strip():
             messagebox.showerror("Error", "Please enter a YouTube playlist URL")
             return
         
-        threading.Thread(target=self._load_playlist_thread, daemon=True).start()
+        threading.Thread(
+            target=self._load_playlist_thread, args=(self.playlist_url.get(), refresh), daemon=True
+        ).start()
 
-    def _load_playlist_thread(self):
+    def _load_playlist_thread(self, current_url, refresh=False):
         """Thread function to load playlist"""
         try:
-            current_url = self.playlist_url.get()
-            print(f"[DEBUG] _load_playlist_thread: Loading URL: {current_url}")
+            logger.debug("_load_playlist_thread: Loading URL: %s", current_url)
             self.update_status("Loading playlist...", "blue")
             self.update_progress(10)
             
-            playlist_id = self.extract_playlist_id(current_url)
-            print(f"[DEBUG] _load_playlist_thread: Playlist ID from extract_playlist_id: {playlist_id}")
-            if not playlist_id:
+            # Entries arrive one page at a time; keep the user posted on long playlists
+            def report(count):
+                if count % 100 == 0:
+                    self.update_status(f"Loading playlist... {count} videos so far", "blue")
+            
+            try:
+                with contextlib.closing(PlaylistSnapshots()) as snapshots:
+                    playlist = transcript_core.load_playlist(
+                        current_url, snapshots, refresh=refresh, on_entry=report)
+            except ValueError:
                 self.update_status("Invalid playlist URL", "red")
+                self.update_progress(0)
                 return
             
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': True,
-                'playlist_items': '1-1000',
-            }
-            
-            self.update_progress(30)
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                playlist_info = ydl.extract_info(
-                    f'https://www.youtube.com/playlist?list={playlist_id}', 
-                    download=False
-                )
-            
             self.update_progress(60)
             
-            if not playlist_info or 'entries' not in playlist_info:
+            videos = playlist['videos']
+            if not videos:
                 self.update_status("No videos found in playlist", "red")
                 return
             
-            self.videos = []
-            self.video_vars = []
-            
-            for entry in playlist_info['entries']:
-                if entry:
-                    video_info = {
-                        'id': entry.get('id', ''),
-                        'title': entry.get('title', 'Unknown Title'),
-                        'url': entry.get('url', f"https://www.youtube.com/watch?v={entry.get('id', '')}")
-                    }
-                    self.videos.append(video_info)
-                    self.video_vars.append(tk.BooleanVar(value=True))
-            
             self.update_progress(80)
             
-            self.display_videos()
+            changes = playlist['changes']
+            self.post_to_ui(self._show_videos, videos, changed_ids(changes) if changes else set())
             
             self.update_progress(100)
-            self.update_status(f"Loaded {len(self.videos)} videos from playlist", "green")
+            if playlist['cached']:
+                minutes = int((time.time() - playlist['fetched_at']) // 60)
+                self.update_status(
+                    f"Loaded {len(videos)} videos from the snapshot taken {minutes} min ago "
+                    f"(Refresh to reload)", "green")
+            else:
+                self.update_status(
+                    f"Loaded {len(videos)} videos from playlist ({describe_changes(changes)})", "green")
             
-            self.root.after(2000, lambda: self.update_progress(0))
+            self.post_to_ui(self.root.after, 2000, lambda: self.update_progress(0))
             
         except Exception as e:
             self.update_status(f"Error loading playlist: {str(e)}", "red")
             self.update_progress(0)
 
+    def _show_videos(self, videos, changed=frozenset()):
+        """Install a freshly loaded video list; runs on the Tk main thread"""
+        self.videos = videos
+        self.changed_ids = set(changed)
+        self.selected = bytearray(b'\x01' * len(videos))
+        self.last_clicked = None
+        self.display_videos()
+
     def display_videos(self):
-        """Display videos list with checkboxes"""
-        self.videos_text.config(state=tk.NORMAL)
-        self.videos_text.delete(1.0, tk.END)
+        """Show the videos matching the filter, with their check state"""
+        self.videos_tree.delete(*self.videos_tree.get_children())
         
-        if not self.videos:
-            self.videos_text.insert(tk.END, "No videos loaded. Please load a playlist first.")
-            self.videos_text.config(state=tk.DISABLED)
-            return
+        needle = self.filter_text.get().strip().lower()
+        self.visible_indices = [
+            i for i, video in enumerate(self.videos)
+            if not needle or needle in video['title'].lower()
+        ]
         
-        self.videos_text.insert(tk.END, f"Found {len(self.videos)} videos in playlist:\n\n")
+        for i in self.visible_indices:
+            self.videos_tree.insert('', tk.END, iid=str(i), values=(
+                CHECKED if self.selected[i] else UNCHECKED, i + 1, self.videos[i]['title']))
         
-        for i, video in enumerate(self.videos):
-            if i < len(self.video_vars):
-                var = self.video_vars[i]
-                display_title = video['title']
-                if len(display_title) > 70:
-                    display_title = display_title[:67] + "..."
+        self._update_selection_label()
 
-                cb = ttk.Checkbutton(self.videos_text, text=f"{i+1:3}. {display_title}", variable=var)
-                
-                self.videos_text.window_create(tk.END, window=cb)
-                self.videos_text.insert(tk.END, "\n")
-            else:
-                self.videos_text.insert(tk.END, f"{i+1:3}. {video['title']} (Error: Selection state unavailable)\n")
+    def _update_selection_label(self):
+        if not self.videos:
+            self.selection_label.config(text="No videos loaded")
+            return
+        text = f"{sum(self.selected)} of {len(self.videos)} selected"
+        if len(self.visible_indices) != len(self.videos):
+            text += f" ({len(self.visible_indices)} shown)"
+        self.selection_label.config(text=text)
+
+    def _set_checked(self, indices, value):
+        """Set the check state of the given video indices"""
+        flag = 1 if value else 0
+        mark = CHECKED if value else UNCHECKED
+        for i in indices:
+            self.selected[i] = flag
+            if self.videos_tree.exists(str(i)):
+                self.videos_tree.set(str(i), 'check', mark)
+        self._update_selection_label()
+
+    def _on_tree_click(self, event):
+        """Toggle a video by clicking its check box; Shift+click applies to the whole range"""
+        if self.videos_tree.identify_region(event.x, event.y) != 'cell':
+            return None
+        if self.videos_tree.identify_column(event.x) != '#1':
+            return None
+        item = self.videos_tree.identify_row(event.y)
+        if not item:
+            return None
         
-        self.videos_text.insert(tk.END, "\n\nNote: All videos are selected by default. Use 'Select All' or 'Deselect All' buttons to manage selection.")
-        self.videos_text.config(state=tk.DISABLED)
+        index = int(item)
+        value = not self.selected[index]
+        anchor = str(self.last_clicked)
+        if event.state & SHIFT_MASK and self.last_clicked is not None and self.videos_tree.exists(anchor):
+            start = self.videos_tree.index(anchor)
+            end = self.videos_tree.index(item)
+            if start > end:
+                start, end = end, start
+            self._set_checked(self.visible_indices[start:end + 1], value)
+        else:
+            self._set_checked([index], value)
+        
+        self.last_clicked = index
+        return "break"
+
+    def _toggle_highlighted(self, event=None):
+        """Flip the check state of the highlighted rows (Space)"""
+        items = self.videos_tree.selection()
+        if not items:
+            return "break"
+        indices = [int(item) for item in items]
+        # Check them all unless every one is already checked
+        self._set_checked(indices, not all(self.selected[i] for i in indices))
+        return "break"
 
     def select_all(self):
-        """Select all videos"""
-        for var in self.video_vars:
-            var.set(True)
-        self.update_status("All videos selected", "green")
+        """Select all videos shown by the current filter"""
+        self._set_checked(self.visible_indices, True)
+        self.update_status(f"{len(self.visible_indices)} videos selected", "green")
 
     def deselect_all(self):
-        """Deselect all videos"""
-        for var in self.video_vars:
-            var.set(False)
-        self.update_status("All videos deselected", "orange")
+        """Deselect all videos shown by the current filter"""
+        self._set_checked(self.visible_indices, False)
+        self.update_status(f"{len(self.visible_indices)} videos deselected", "orange")
+
+    def select_changed(self):
+        """Select only the videos added or renamed since the previous playlist snapshot"""
+        if not self.changed_ids:
+            self.update_status("No videos changed since the previous snapshot", "orange")
+            return
+        changed = [i for i, video in enumerate(self.videos) if video['id'] in self.changed_ids]
+        self._set_checked(range(len(self.videos)), False)
+        self._set_checked(changed, True)
+        self.update_status(f"{len(changed)} changed videos selected", "green")
 
     def fetch_all_transcripts(self):
         """Fetch transcripts for all videos"""
@@ -277,7 +507,8 @@ class YouTubeTranscriptExtractor:
             messagebox.showerror("Error", "Please load a playlist first")
             return
         
-        self.select_all()
+        self._set_checked(range(len(self.videos)), True)
+        self.update_status("All videos selected", "green")
         self._fetch_transcripts()
 
     def fetch_selected_transcripts(self):
@@ -286,13 +517,65 @@ class YouTubeTranscriptExtractor:
             messagebox.showerror("Error", "Please load a playlist first")
             return
         
-        selected_count = sum(1 for var in self.video_vars if var.get())
+        selected_count = sum(self.selected)
         if selected_count == 0:
             messagebox.showwarning("Warning", "No videos selected. Please select at least one video.")
             return
         
         self._fetch_transcripts()
 
+    def resume_last_run(self):
+        """Retry the failed and unfinished videos recorded in the output directory's job journal"""
+        if self.is_fetching:
+            messagebox.showwarning("Warning", "Already fetching transcripts. Please wait.")
+            return
+        
+        output_dir = self.output_dir.get().strip()
+        journal = JobJournal(output_dir) if output_dir else None
+        if journal is None or not journal.exists:
+            messagebox.showerror("Error", "No interrupted run found in the selected output directory")
+            return
+        
+        videos = journal.unfinished()
+        if not videos:
+            messagebox.showinfo("Resume", "Every video of the last run was already saved.")
+            return
+        
+        try:
+            max_workers = max(1, int(self.max_workers.get()))
+        except (tk.TclError, ValueError):
+            messagebox.showerror("Error", "Number of workers must be a positive integer")
+            return
+        
+        # Repeat the interrupted job's options; only throughput settings come from the form
+        fetch_options = dict(journal.options)
+        fetch_options.update({
+            'max_workers': max_workers,
+            'bypass_cache': self.bypass_cache.get(),
+            'resume': True,
+        })
+        
+        self.update_status(f"Resuming {len(videos)} unfinished videos...", "blue")
+        self.is_fetching = True
+        threading.Thread(
+            target=self._fetch_transcripts_thread,
+            args=(videos, output_dir, fetch_options),
+            daemon=True
+        ).start()
+
+    def cancel_fetch(self):
+        """Stop the running fetch; videos already in progress finish and the rest can be resumed"""
+        fetcher = self.fetcher
+        if fetcher is None:
+            return
+        fetcher.cancel()
+        self.update_status("Cancelling: finishing the videos in progress...", "orange")
+
+    def on_close(self):
+        """Cancel any running fetch so its worker threads do not outlive the window"""
+        self.cancel_fetch()
+        self.root.destroy()
+
     def _fetch_transcripts(self):
         """Start transcript fetching in separate thread"""
         if self.is_fetching:
@@ -307,211 +590,92 @@ class YouTubeTranscriptExtractor:
             messagebox.showerror("Error", "Selected output directory does not exist")
             return
         
-        threading.Thread(target=self._fetch_transcripts_thread, daemon=True).start()
-
-    def get_transcript_with_yt_dlp(self, video_id):
-        """Alternative method to get transcript using yt-dlp"""
         try:
-            ydl_opts = {
-                'writesubtitles': True,
-                'writeautomaticsub': True,
-                'subtitleslangs': ['hi', 'en'],
-                'skip_download': True,
-                'quiet': True,
-                'no_warnings': True,
-            }
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(f'https://www.youtube.com/watch?v={video_id}', download=False)
-                
-                # Check for subtitles
-                if 'subtitles' in info:
-                    # Try Hindi first
-                    if 'hi' in info['subtitles']:
-                        return self.parse_yt_dlp_subtitles(info['subtitles']['hi']), 'hi'
-                    elif 'en' in info['subtitles']:
-                        return self.parse_yt_dlp_subtitles(info['subtitles']['en']), 'en'
-                
-                # Check for automatic captions
-                if 'automatic_captions' in info:
-                    if 'hi' in info['automatic_captions']:
-                        return self.parse_yt_dlp_subtitles(info['automatic_captions']['hi']), 'hi'
-                    elif 'en' in info['automatic_captions']:
-                        return self.parse_yt_dlp_subtitles(info['automatic_captions']['en']), 'en'
-                
-                return None, None
-                
-        except Exception as e:
-            print(f"[ERROR] yt-dlp transcript fetch failed: {e}")
-            return None, None
-
-    def parse_yt_dlp_subtitles(self, subtitle_info):
-        """Parse subtitle info from yt-dlp to transcript format"""
-        # This is a placeholder - actual implementation would need to download and parse the subtitle file
-        # For now, return None to indicate this method needs the actual subtitle content
-        return None
+            max_workers = max(1, int(self.max_workers.get()))
+        except (tk.TclError, ValueError):
+            messagebox.showerror("Error", "Number of workers must be a positive integer")
+            return
+        
+        # Snapshot Tk state here; worker threads must not touch Tk variables
+        selected_videos = [video for video, flag in zip(self.videos, self.selected) if flag]
+        
+        fetch_options = {
+            'max_workers': max_workers,
+            'bypass_cache': self.bypass_cache.get(),
+            'sync_mode': self.sync_mode.get(),
+            'output_format': self.output_format.get(),
+            'naming': self.naming.get(),
+            'archive': self.archive_output.get(),
+            'merge': self.merge.get(),
+            'index_path': os.path.join(self.output_dir.get(), INDEX_FILENAME) if self.build_index.get() else None,
+        }
+        
+        self.is_fetching = True
+        threading.Thread(
+            target=self._fetch_transcripts_thread,
+            args=(selected_videos, self.output_dir.get(), fetch_options),
+            daemon=True
+        ).start()
 
-    def _fetch_transcripts_thread(self):
-        """Thread function to fetch transcripts"""
+    def _fetch_transcripts_thread(self, selected_videos, output_dir, fetch_options):
+        """Thread function to fetch transcripts using transcript_core"""
         self.is_fetching = True
+        self.post_to_ui(self._reset_worker_table)
         
         try:
-            selected_videos = [
-                video for i, video in enumerate(self.videos) 
-                if i < len(self.video_vars) and self.video_vars[i].get()
-            ]
-            
-            total_videos = len(selected_videos)
-            successful_downloads = 0
-            failed_downloads_count = 0
-            failed_video_details = []
-            
-            self.update_status(f"Fetching transcripts for {total_videos} videos...", "blue")
-            
-            for i, video in enumerate(selected_videos):
-                video_serial_number = i + 1
-                transcript_fetched_successfully = False
-                last_exception = None
-
-                for attempt in range(1, 4):
-                    try:
-                        progress = (video_serial_number / total_videos) * 100
-                        self.update_progress(progress)
-                        status_message = f"Processing ({video_serial_number}/{total_videos}): {video['title'][:40]}..."
-                        if attempt > 1:
-                            status_message += f" (Attempt {attempt})"
-                        self.update_status(status_message, "blue")
-
-                        transcript_data = None
-                        fetched_lang_code = "N/A"
-
-                        # Method 1: Try youtube_transcript_api with better error handling
-                        try:
-                            # Try to list available transcripts first
-                            transcript_list = YouTubeTranscriptApi.list_transcripts(video['id'])
-                            
-                            # Try to get Hindi transcript
-                            try:
-                                transcript = transcript_list.find_transcript(['hi'])
-                                transcript_data = transcript.fetch()
-                                fetched_lang_code = 'hi'
-                                print(f"[INFO] Fetched Hindi transcript for {video['title']}")
-                            except:
-                                # Try English if Hindi fails
-                                try:
-                                    transcript = transcript_list.find_transcript(['en'])
-                                    transcript_data = transcript.fetch()
-                                    fetched_lang_code = 'en'
-                                    print(f"[INFO] Fetched English transcript for {video['title']}")
-                                except:
-                                    # Get first available transcript
-                                    for transcript in transcript_list:
-                                        try:
-                                            transcript_data = transcript.fetch()
-                                            fetched_lang_code = transcript.language_code
-                                            print(f"[INFO] Fetched {fetched_lang_code} transcript for {video['title']}")
-                                            break
-                                        except:
-                                            continue
-                        
-                        except Exception as e:
-                            print(f"[WARN] youtube_transcript_api failed: {e}")
-                            
-                            # Method 2: Try direct get_transcript as fallback
-                            try:
-                                transcript_data = YouTubeTranscriptApi.get_transcript(video['id'])
-                                fetched_lang_code = 'auto'
-                                print(f"[INFO] Fetched auto transcript for {video['title']}")
-                            except:
-                                raise Exception("All transcript fetch methods failed")
-
-                        if not transcript_data:
-                            raise Exception("No transcript data retrieved")
-
-                        # Format transcript
-                        formatted_transcript = self.format_transcript_with_timestamps(
-                            transcript_data, video['title']
-                        )
-                        
-                        # Save to file
-                        filename = self.sanitize_filename(video['title']) + '.md'
-                        filepath = os.path.join(self.output_dir.get(), filename)
-                        
-                        with open(filepath, 'w', encoding='utf-8') as f:
-                            f.write(formatted_transcript)
-                        
-                        successful_downloads += 1
-                        transcript_fetched_successfully = True
-                        break
-                        
-                    except Exception as e:
-                        last_exception = e
-                        print(f"Attempt {attempt} failed for {video['title']}: {e}")
-                        if attempt < 3:
-                            self.update_status(f"Retrying {video['title'][:40]}... (Attempt {attempt+1})", "orange")
-                            time.sleep(3)  # Increased wait time
-                        else:
-                            print(f"All retries failed for {video['title']}: {last_exception}")
-                            failed_downloads_count += 1
-                            failed_video_details.append((video_serial_number, video['title']))
+            # Opt-in: TRANSCRIPT_PROFILE=run.prof writes a cProfile dump of the whole run
+            with profiled(os.environ.get(PROFILE_ENV_VAR)) as profiler:
+                fetcher = TranscriptFetcher(
+                    output_dir,
+                    on_status=self.report_status,
+                    on_progress=self.update_progress,
+                    profiler=profiler,
+                    **fetch_options
+                )
+                self.fetcher = fetcher
+                summary = fetcher.run(selected_videos)
+            logger.info("Run metrics: %s", json.dumps(summary['metrics']))
             
             # Final update
             self.update_progress(100)
             
             completion_message = f"Transcript extraction completed!\n"
-            completion_message += f"Successful: {successful_downloads}\n"
-            completion_message += f"Failed: {failed_downloads_count}\n"
-            completion_message += f"Files saved to: {self.output_dir.get()}\n"
+            completion_message += f"Successful: {summary['successful']}\n"
+            completion_message += f"Failed: {summary['failed']}\n"
+            if summary['cancelled']:
+                completion_message += f"Cancelled: {summary['cancelled']} (use Resume Last Run to fetch them)\n"
+            if fetch_options.get('sync_mode'):
+                completion_message += f"Already up to date: {summary['up_to_date']}\n"
+            completion_message += f"Files saved to: {output_dir}\n"
 
-            if failed_downloads_count == 0:
+            if summary['failed'] == 0:
                 self.update_status(
-                    f"Successfully downloaded {successful_downloads} transcripts!", "green"
+                    f"Successfully downloaded {summary['successful']} transcripts!", "green"
                 )
             else:
-                status_text = f"Downloaded {successful_downloads}, {failed_downloads_count} failed."
+                status_text = f"Downloaded {summary['successful']}, {summary['failed']} failed."
                 self.update_status(status_text, "orange")
                 completion_message += "\nFailed Videos:\n"
-                for sn, title in failed_video_details:
-                    completion_message += f"  {sn}. {title}\n"
+                for detail in summary['failed_videos']:
+                    completion_message += f"  {detail['index']}. {detail['title']}\n"
 
-            messagebox.showinfo("Complete", completion_message)
+            # Tk is not thread-safe: dialogs are opened by the main thread
+            self.post_to_ui(messagebox.showinfo, "Complete", completion_message)
             
-            self.root.after(3000, lambda: self.update_progress(0))
+            self.post_to_ui(self.root.after, 3000, lambda: self.update_progress(0))
             
         except Exception as e:
             self.update_status(f"Error: {str(e)}", "red")
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+            self.post_to_ui(messagebox.showerror, "Error", f"An error occurred: {str(e)}")
         
         finally:
+            self.fetcher = None
+            self.post_to_ui(self._mark_workers_idle)
             self.is_fetching = False
 
-    def format_transcript_with_timestamps(self, transcript_list, title):
-        """Format transcript with timestamps in markdown"""
-        formatted_content = f"# {title}\n\n"
-        formatted_content += f"**Video Title:** {title}\n\n"
-        formatted_content += f"**Transcript extracted on:** {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-        formatted_content += "---\n\n"
-        
-        for entry in transcript_list:
-            # Handle both dict and object formats
-            if isinstance(entry, dict):
-                start_time = entry.get('start', 0)
-                text = entry.get('text', '')
-            else:
-                start_time = getattr(entry, 'start', 0)
-                text = getattr(entry, 'text', '')
-            
-            # Convert seconds to MM:SS format
-            minutes = int(start_time // 60)
-            seconds = int(start_time % 60)
-            timestamp = f"{minutes:02d}:{seconds:02d}"
-            
-            formatted_content += f"**[{timestamp}]** {text}\n\n"
-        
-        return formatted_content
-
 def main():
     """Main function to run the application"""
+    configure_logging(os.environ.get(LOG_LEVEL_ENV_VAR, DEFAULT_LOG_LEVEL))
     root = tk.Tk()
     app = YouTubeTranscriptExtractor(root)
     
@@ -0,0 +1,204 @@
+"""Local stand-in for the YouTube endpoints used by the extractor.
+
+FakeYouTube serves playlists, transcript listings, transcripts and json3
+subtitles from memory with configurable latency, error and throttling
+rates, so the whole fetch pipeline can be exercised without a network.
+"""
+import io
+import json
+import random
+import threading
+import time
+
+from youtube_transcript_api import RequestBlocked, TranscriptsDisabled
+
+from connection_pool import ConnectionPool
+from transcript_core import TranscriptFetcher
+
+WORDS = ('lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing', 'elit',
+         'sed', 'do', 'eiusmod', 'tempor', 'incididunt', 'ut', 'labore', 'magna')
+# Caption lines are drawn from a fixed pool so generating them costs next to nothing
+SENTENCE_POOL_SIZE = 997
+
+
+class FakeYouTube:
+    """Shared state and dice for every fake endpoint.
+
+    `latency` is the mean seconds per request (uniformly spread by
+    `jitter`), `error_rate` the share of requests failing with a transient
+    ConnectionError, `throttle_rate` the share answered like an HTTP 429
+    and `disabled_rate` the share of videos without any transcript.
+    """
+
+    def __init__(self, latency=0.01, jitter=0.5, error_rate=0.0, throttle_rate=0.0,
+                 disabled_rate=0.0, segments=300, languages=('en',), seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.disabled_rate = disabled_rate
+        self.segments = segments
+        self.languages = tuple(languages)
+        self.seed = seed
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        rng = random.Random(seed)
+        self.sentences = [
+            ' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 12)))
+            for _ in range(SENTENCE_POOL_SIZE)
+        ]
+
+    def request(self, video_id):
+        """Count, delay and possibly fail one request"""
+        with self._lock:
+            self.requests += 1
+            spread = self._random.uniform(1 - self.jitter, 1 + self.jitter)
+            roll = self._random.random()
+        if self.latency:
+            time.sleep(self.latency * spread)
+        if roll < self.throttle_rate:
+            raise RequestBlocked(video_id)
+        if roll < self.throttle_rate + self.error_rate:
+            raise ConnectionError(f"fake connection reset while fetching {video_id}")
+
+    def is_disabled(self, video_id):
+        # Decided per video, not per request, so retries see the same answer
+        return random.Random(f"{self.seed}:{video_id}").random() < self.disabled_rate
+
+    def make_segments(self, video_id):
+        offset = sum(video_id.encode('utf-8'))
+        return [
+            {
+                'text': self.sentences[(offset + position) % SENTENCE_POOL_SIZE],
+                'start': position * 2.5,
+                'duration': 2.5,
+            }
+            for position in range(self.segments)
+        ]
+
+    def playlist_entries(self, count, prefix='vid'):
+        return [
+            {'id': f"{prefix}{number:07d}", 'title': f"Benchmark video {number}",
+             'url': f"https://www.youtube.com/watch?v={prefix}{number:07d}"}
+            for number in range(count)
+        ]
+
+    def transcript_api(self):
+        return FakeTranscriptApi(self)
+
+    def youtube_dl(self, playlist_size=0):
+        return FakeYoutubeDL(self, playlist_size)
+
+
+class FakeTranscript:
+    def __init__(self, backend, video_id, language_code, is_generated=False):
+        self.backend = backend
+        self.video_id = video_id
+        self.language_code = language_code
+        self.language = language_code
+        self.is_generated = is_generated
+        self.is_translatable = True
+
+    def fetch(self):
+        self.backend.request(self.video_id)
+        return self.backend.make_segments(self.video_id)
+
+    def translate(self, language_code):
+        return FakeTranscript(self.backend, self.video_id, language_code, self.is_generated)
+
+
+class FakeTranscriptList:
+    def __init__(self, backend, video_id):
+        self.video_id = video_id
+        self.tracks = [FakeTranscript(backend, video_id, code) for code in backend.languages]
+        self.tracks += [FakeTranscript(backend, video_id, code, is_generated=True) for code in backend.languages]
+
+    def __iter__(self):
+        return iter(self.tracks)
+
+
+class FakeTranscriptApi:
+    """Same instance interface as youtube_transcript_api.YouTubeTranscriptApi"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def list(self, video_id):
+        self.backend.request(video_id)
+        if self.backend.is_disabled(video_id):
+            raise TranscriptsDisabled(video_id)
+        return FakeTranscriptList(self.backend, video_id)
+
+    def fetch(self, video_id, languages=('en',)):
+        transcript = next(iter(self.list(video_id)))
+        return transcript.fetch()
+
+
+class FakeYoutubeDL:
+    """Answers extract_info() for playlists and videos and urlopen() for json3 subtitles"""
+
+    def __init__(self, backend, playlist_size=0):
+        self.backend = backend
+        self.playlist_size = playlist_size
+
+    def extract_info(self, url, download=False, process=True):
+        if 'list=' in url:
+            entries = (dict(entry) for entry in self.backend.playlist_entries(self.playlist_size))
+            return {'title': f"Benchmark playlist ({self.playlist_size} videos)", 'entries': entries}
+
+        video_id = url.rsplit('v=', 1)[-1]
+        self.backend.request(video_id)
+        if self.backend.is_disabled(video_id):
+            return {'subtitles': {}, 'automatic_captions': {}}
+        track = [{'ext': 'json3', 'url': f"fake://json3/{video_id}"}]
+        return {'subtitles': {code: track for code in self.backend.languages}, 'automatic_captions': {}}
+
+    def urlopen(self, url):
+        video_id = url.rsplit('/', 1)[-1]
+        self.backend.request(video_id)
+        events = [
+            {'tStartMs': int(segment['start'] * 1000), 'dDurationMs': int(segment['duration'] * 1000),
+             'segs': [{'utf8': segment['text']}]}
+            for segment in self.backend.make_segments(video_id)
+        ]
+        return io.BytesIO(json.dumps({'events': events}).encode('utf-8'))
+
+    def close(self):
+        pass
+
+
+class FakeConnectionPool(ConnectionPool):
+    """ConnectionPool whose transcript API and YoutubeDL are served by a FakeYouTube"""
+
+    def __init__(self, backend, **kwargs):
+        super().__init__(**kwargs)
+        self.backend = backend
+
+    def transcript_api(self):
+        return self.backend.transcript_api()
+
+    def youtube_dl(self):
+        return self.backend.youtube_dl()
+
+
+class FakeBackendFetcher(TranscriptFetcher):
+    """TranscriptFetcher wired to a FakeYouTube that also records each video's wall time"""
+
+    def __init__(self, output_dir, backend, **options):
+        super().__init__(output_dir, **options)
+        self.backend = backend
+        self.video_seconds = []
+        self._timings_lock = threading.Lock()
+
+    def _make_connections(self):
+        return FakeConnectionPool(self.backend, pool_size=self.pool_size, proxies=self.proxies)
+
+    def _fetch_single_video(self, video, video_serial_number, total_videos, filenames):
+        started = time.perf_counter()
+        try:
+            return super()._fetch_single_video(video, video_serial_number, total_videos, filenames)
+        finally:
+            with self._timings_lock:
+                self.video_seconds.append(time.perf_counter() - started)
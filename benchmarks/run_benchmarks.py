@@ -0,0 +1,269 @@
+"""Offline benchmarks for the fetch pipeline.
+
+Streams fake playlists of several sizes through TranscriptFetcher, with
+FakeYouTube standing in for YouTube, and reports throughput, per-video
+latency percentiles, peak memory (RSS growth during the run) and the cost
+of each output format. Nothing touches the network, so this can run in CI:
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --sizes 10,1000 --baseline results.json
+
+With --baseline the exit status is 1 when throughput, p95 latency or
+formatting speed regressed by more than --tolerance.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_youtube import FakeYouTube, FakeBackendFetcher  # noqa: E402
+from instrumentation import configure_logging  # noqa: E402
+from transcript_core import PlaylistStream  # noqa: E402
+from transcript_formats import FORMATS, DEFAULT_FORMAT, iter_transcript  # noqa: E402
+
+DEFAULT_SIZES = '10,1000,10000'
+# High enough that the client-side rate limiter never becomes the bottleneck being measured
+DEFAULT_BENCHMARK_RATE = 10000.0
+DEFAULT_TOLERANCE = 0.2
+FORMAT_REPEATS = 20
+MEMORY_SAMPLE_INTERVAL = 0.02
+
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of `values` (0 <= q <= 100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(q / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def current_rss():
+    """Resident set size in bytes, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class PeakMemorySampler:
+    """Polls the process RSS in the background; far cheaper than tracemalloc, so timings stay honest"""
+
+    def __init__(self, interval=MEMORY_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.baseline = None
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            rss = current_rss()
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+
+    def __enter__(self):
+        self.baseline = current_rss()
+        self.peak = self.baseline
+        if self.baseline is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        return False
+
+
+def make_backend(args):
+    return FakeYouTube(
+        latency=args.latency, error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+        disabled_rate=args.disabled_rate, segments=args.segments, seed=args.seed)
+
+
+def bench_fetch(size, args):
+    """Run one fake playlist of `size` videos end to end"""
+    backend = make_backend(args)
+    workdir = tempfile.mkdtemp(prefix='transcript-bench-')
+    try:
+        fetcher = FakeBackendFetcher(
+            os.path.join(workdir, 'out'), backend,
+            max_workers=args.workers,
+            output_format=args.format,
+            cache_path=os.path.join(workdir, 'cache.sqlite3'),
+            requests_per_second=args.rate,
+            use_fallback=not args.no_fallback,
+        )
+        stream = PlaylistStream('https://www.youtube.com/playlist?list=PLbenchmark',
+                                ydl=backend.youtube_dl(size))
+
+        with PeakMemorySampler() as memory:
+            started = time.perf_counter()
+            summary = fetcher.run(stream)
+            elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    latencies = fetcher.video_seconds
+    return {
+        'videos': size,
+        'successful': summary['successful'],
+        'failed': summary['failed'],
+        'elapsed_seconds': round(elapsed, 4),
+        'videos_per_second': round(size / elapsed, 2) if elapsed else None,
+        'requests': backend.requests,
+        'latency_seconds': {
+            'p50': percentile(latencies, 50),
+            'p90': percentile(latencies, 90),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'max': max(latencies) if latencies else None,
+        },
+        'peak_rss_bytes': memory.peak,
+        'rss_growth_bytes': memory.peak - memory.baseline if memory.baseline is not None else None,
+        'counters': summary['metrics']['counters'],
+        'stages': {stage: stats['sum'] for stage, stats in summary['metrics']['stages'].items()},
+    }
+
+
+def bench_formatting(args):
+    """Time each output format on one transcript of --segments segments"""
+    backend = make_backend(args)
+    video = {'id': 'vid0000000', 'title': 'Benchmark video 0'}
+    segments = backend.make_segments(video['id'])
+
+    results = {}
+    for output_format in FORMATS:
+        size = 0
+        started = time.perf_counter()
+        for _ in range(FORMAT_REPEATS):
+            buffer = io.StringIO()
+            buffer.writelines(iter_transcript(segments, video, output_format))
+            size = buffer.tell()
+        elapsed = (time.perf_counter() - started) / FORMAT_REPEATS
+        results[output_format] = {
+            'seconds_per_transcript': round(elapsed, 6),
+            'microseconds_per_segment': round(elapsed / max(1, len(segments)) * 1e6, 3),
+            'characters': size,
+            'megabytes_per_second': round(size / elapsed / 1e6, 2) if elapsed else None,
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """List human-readable regressions of `results` against `baseline`"""
+    regressions = []
+    baseline_runs = {run['videos']: run for run in baseline.get('runs', [])}
+    for run in results['runs']:
+        old = baseline_runs.get(run['videos'])
+        if not old:
+            continue
+        if old['videos_per_second'] and run['videos_per_second'] < old['videos_per_second'] * (1 - tolerance):
+            regressions.append(
+                f"{run['videos']} videos: throughput {run['videos_per_second']}/s "
+                f"vs {old['videos_per_second']}/s")
+        old_p95 = old['latency_seconds']['p95']
+        new_p95 = run['latency_seconds']['p95']
+        if old_p95 and new_p95 and new_p95 > old_p95 * (1 + tolerance):
+            regressions.append(f"{run['videos']} videos: p95 latency {new_p95:.4f}s vs {old_p95:.4f}s")
+
+    for output_format, stats in results['formatting'].items():
+        old = baseline.get('formatting', {}).get(output_format)
+        if old and stats['seconds_per_transcript'] > old['seconds_per_transcript'] * (1 + tolerance):
+            regressions.append(
+                f"{output_format} formatting: {stats['seconds_per_transcript']:.6f}s "
+                f"vs {old['seconds_per_transcript']:.6f}s per transcript")
+    return regressions
+
+
+def print_report(results):
+    print(f"{'videos':>8} {'ok':>7} {'failed':>6} {'seconds':>9} {'videos/s':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'+RSS MiB':>9}")
+    for run in results['runs']:
+        latency = run['latency_seconds']
+        peak = run['rss_growth_bytes']
+        print(f"{run['videos']:>8} {run['successful']:>7} {run['failed']:>6} {run['elapsed_seconds']:>9.2f} "
+              f"{run['videos_per_second']:>9.1f} {latency['p50'] * 1000:>8.1f} {latency['p95'] * 1000:>8.1f} "
+              f"{latency['p99'] * 1000:>8.1f} {(peak / 2 ** 20 if peak is not None else float('nan')):>9.1f}")
+    print()
+    print(f"{'format':>8} {'ms/transcript':>14} {'us/segment':>11} {'MB/s':>8}")
+    for output_format, stats in results['formatting'].items():
+        print(f"{output_format:>8} {stats['seconds_per_transcript'] * 1000:>14.3f} "
+              f"{stats['microseconds_per_segment']:>11.2f} {stats['megabytes_per_second']:>8.1f}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Benchmark the transcript pipeline against a fake YouTube.')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help='comma-separated playlist sizes (default: %(default)s)')
+    parser.add_argument('-j', '--workers', type=int, default=8, help='fetch workers (default: %(default)s)')
+    parser.add_argument('--latency', type=float, default=0.005,
+                        help='mean seconds per fake request (default: %(default)s)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='share of requests failing with a transient error (default: %(default)s)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help='share of requests answered like HTTP 429 (default: %(default)s)')
+    parser.add_argument('--disabled-rate', type=float, default=0.0,
+                        help='share of videos without transcripts (default: %(default)s)')
+    parser.add_argument('--segments', type=int, default=300,
+                        help='segments per transcript (default: %(default)s)')
+    parser.add_argument('--format', choices=list(FORMATS), default=DEFAULT_FORMAT,
+                        help='output format written by the fetch runs (default: %(default)s)')
+    parser.add_argument('--rate', type=float, default=DEFAULT_BENCHMARK_RATE,
+                        help='client-side requests per second limit (default: %(default)s)')
+    parser.add_argument('--no-fallback', action='store_true', help='disable the yt-dlp failover')
+    parser.add_argument('--seed', type=int, default=0, help='seed for latency and error dice')
+    parser.add_argument('--output', metavar='PATH', help='write the results as JSON')
+    parser.add_argument('--baseline', metavar='PATH', help='JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed relative slowdown against the baseline (default: %(default)s)')
+    parser.add_argument('--log-level', default='ERROR', help='pipeline log level (default: %(default)s)')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    configure_logging(args.log_level)
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+
+    results = {
+        'python': platform.python_version(),
+        'settings': {key: value for key, value in vars(args).items()
+                     if key not in ('output', 'baseline', 'log_level')},
+        'runs': [],
+    }
+    for size in sizes:
+        print(f"Fetching {size} fake videos...", file=sys.stderr)
+        results['runs'].append(bench_fetch(size, args))
+    results['formatting'] = bench_formatting(args)
+
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions:
+            return EXIT_REGRESSION
+    return EXIT_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""Shared keep-alive HTTP sessions, proxy rotation and reusable YoutubeDL instances"""
+import inspect
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from youtube_transcript_api import YouTubeTranscriptApi
+
+DEFAULT_POOL_SIZE = 16
+
+logger = logging.getLogger(__name__)
+
+
+class LegacyTranscriptApi:
+    """Gives youtube_transcript_api < 1.0 the instance interface of newer releases.
+
+    Old releases only have class methods that open a new session per call,
+    so the shared session cannot be used; its proxies still are.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def list(self, video_id):
+        return YouTubeTranscriptApi.list_transcripts(video_id, proxies=self.session.proxies or None)
+
+    def fetch(self, video_id, languages=('en',)):
+        return YouTubeTranscriptApi.get_transcript(
+            video_id, languages=languages, proxies=self.session.proxies or None)
+
+
+def supports_http_client():
+    """True when the installed youtube_transcript_api accepts a requests session.
+
+    Checked on the constructor itself: 1.0 and 1.1 still ship the deprecated
+    class methods next to the instance API, so their presence proves nothing.
+    """
+    try:
+        parameters = inspect.signature(YouTubeTranscriptApi.__init__).parameters
+    except (TypeError, ValueError):
+        return False
+    return 'http_client' in parameters
+
+
+class ConnectionPool:
+    """One pooled requests.Session per proxy (or a single direct one), shared by all workers.
+
+    Every worker gets the session of the current proxy; rotate() moves all
+    workers on to the next proxy, e.g. after YouTube starts throttling. Each
+    worker thread also keeps one YoutubeDL instance, rebuilt only when the
+    proxy changes.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, proxies=None):
+        self.pool_size = pool_size
+        self.proxies = list(proxies or [None])
+        self._sessions = [self._make_session(proxy) for proxy in self.proxies]
+        self._apis = {}
+        self._current = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._youtube_dls = []
+
+    def _make_session(self, proxy):
+        session = requests.Session()
+        # Retries are handled by the fetcher's backoff policy, not urllib3
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if proxy:
+            session.proxies = {'http': proxy, 'https': proxy}
+        return session
+
+    @property
+    def proxy(self):
+        return self.proxies[self._current]
+
+    def session(self):
+        """The keep-alive session for the current proxy"""
+        return self._sessions[self._current]
+
+    def rotate(self):
+        """Switch every worker to the next proxy; returns the new proxy (None means direct)"""
+        with self._lock:
+            if len(self.proxies) > 1:
+                self._current = (self._current + 1) % len(self.proxies)
+                logger.info("Rotating to proxy %d/%d", self._current + 1, len(self.proxies))
+            return self.proxy
+
+    def transcript_api(self):
+        """A YouTubeTranscriptApi bound to the current session"""
+        with self._lock:
+            index = self._current
+            if index not in self._apis:
+                session = self._sessions[index]
+                if supports_http_client():
+                    self._apis[index] = YouTubeTranscriptApi(http_client=session)
+                else:
+                    self._apis[index] = LegacyTranscriptApi(session)
+            return self._apis[index]
+
+    def youtube_dl(self):
+        """This worker thread's YoutubeDL, created on first use"""
+        import yt_dlp
+
+        proxy = self.proxy
+        ydl = getattr(self._local, 'ydl', None)
+        if ydl is None or self._local.proxy != proxy:
+            if ydl is not None:
+                ydl.close()
+                with self._lock:
+                    self._youtube_dls.remove(ydl)
+            ydl_opts = {
+                'skip_download': True,
+                'quiet': True,
+                'no_warnings': True,
+            }
+            if proxy:
+                ydl_opts['proxy'] = proxy
+            ydl = yt_dlp.YoutubeDL(ydl_opts)
+            self._local.ydl = ydl
+            self._local.proxy = proxy
+            with self._lock:
+                self._youtube_dls.append(ydl)
+        return ydl
+
+    def close(self):
+        with self._lock:
+            for ydl in self._youtube_dls:
+                ydl.close()
+            self._youtube_dls = []
+            for session in self._sessions:
+                session.close()
@@ -0,0 +1,64 @@
+"""Output file names: single-pass sanitizing and per-directory collision handling"""
+import re
+import threading
+
+# 'title' keeps plain titles and adds the video ID only when two videos collide
+NAMING_SCHEMES = ('title', 'title-id', 'index')
+DEFAULT_NAMING = 'title'
+MAX_FILENAME_LENGTH = 100
+
+# Characters Windows forbids in file names and non-whitespace control characters
+_INVALID_CHARACTERS = str.maketrans({
+    character: '_'
+    for character in '<>:"/\\|?*' + ''.join(chr(code) for code in range(32) if not chr(code).isspace())
+})
+_WHITESPACE = re.compile(r'\s+')
+
+
+def sanitize_filename(filename, max_length=MAX_FILENAME_LENGTH):
+    """Replace invalid characters in one translate() pass, collapse whitespace and truncate"""
+    filename = _WHITESPACE.sub(' ', filename.translate(_INVALID_CHARACTERS).strip())
+    return filename[:max_length]
+
+
+def candidate_names(video, naming=DEFAULT_NAMING, position=None):
+    """Base names to try for a video, most preferred first; the last one always carries the video ID"""
+    video_id = video['id']
+    title = sanitize_filename(video['title']) or video_id
+    short_title = sanitize_filename(video['title'], MAX_FILENAME_LENGTH - len(video_id) - 3)
+    with_id = f"{short_title} [{video_id}]" if short_title else video_id
+
+    if naming == 'title-id':
+        return [with_id]
+    if naming == 'index':
+        prefix = f"{video.get('playlist_index') or position or 0:03d} - "
+        return [prefix + title, prefix + with_id]
+    return [title, with_id]
+
+
+class FilenameRegistry:
+    """Which video owns each file name in one directory, so no name is handed to two videos.
+
+    Seed it with the names a manifest already assigned; lookups ignore case
+    because Windows and macOS file systems do.
+    """
+
+    def __init__(self, owners=None):
+        self._owners = {name.casefold(): video_id for name, video_id in (owners or {}).items()}
+        self._lock = threading.Lock()
+
+    def claim(self, video_id, candidates, extension=''):
+        """Return the first candidate (plus extension) that is free or already this video's"""
+        with self._lock:
+            for base in candidates:
+                name = base + extension
+                if self._owners.setdefault(name.casefold(), video_id) == video_id:
+                    return name
+
+            # Only reachable when even the ID-bearing name belongs to another video
+            counter = 2
+            while True:
+                name = f"{candidates[-1]} ({counter}){extension}"
+                if self._owners.setdefault(name.casefold(), video_id) == video_id:
+                    return name
+                counter += 1
@@ -0,0 +1,232 @@
+"""Logging setup, per-run metrics and an opt-in profiler for the fetch pipeline"""
+import contextlib
+import cProfile
+import io
+import json
+import logging
+import pstats
+import sys
+import threading
+import time
+
+LOG_FORMATS = ('text', 'json')
+DEFAULT_LOG_LEVEL = 'INFO'
+# Set to a file path to profile fetch runs started from the GUI
+PROFILE_ENV_VAR = 'TRANSCRIPT_PROFILE'
+LOG_LEVEL_ENV_VAR = 'TRANSCRIPT_LOG_LEVEL'
+METRICS_PREFIX = 'transcript_extractor'
+
+# Upper bounds in seconds; wide enough for a fast cache read and a throttled retry sleep
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any fields passed with `extra=`"""
+
+    def format(self, record):
+        entry = {
+            'time': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(level=DEFAULT_LOG_LEVEL, log_format='text', stream=None):
+    """Send every module's log records to `stream` (stderr by default) at `level`"""
+    handler = logging.StreamHandler(stream or sys.stderr)
+    if log_format == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('[%(levelname)s] %(message)s'))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram in the Prometheus style"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        position = 0
+        while position < len(self.buckets) and value > self.buckets[position]:
+            position += 1
+        self.counts[position] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (the maximum for the overflow bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for position, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return self.buckets[position] if position < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'min': self.min,
+            'max': self.max,
+            'mean': round(self.sum / self.count, 6) if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+        }
+
+
+class Metrics:
+    """Thread-safe counters and per-stage timing histograms for one fetch run"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.counters = {}
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            if stage not in self.stages:
+                self.stages[stage] = Histogram()
+            self.stages[stage].observe(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, stage):
+        """Time the body of a with-block as one observation of `stage`, even if it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def snapshot(self):
+        """Counters and stage statistics as a JSON-serializable dict"""
+        with self._lock:
+            return {
+                'elapsed_seconds': round(time.time() - self.started, 3),
+                'counters': dict(sorted(self.counters.items())),
+                'stages': {stage: histogram.snapshot() for stage, histogram in sorted(self.stages.items())},
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix=METRICS_PREFIX):
+        """Prometheus text exposition format, e.g. for the node_exporter textfile collector"""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f"{prefix}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+
+            metric = f"{prefix}_stage_seconds"
+            if self.stages:
+                lines.append(f"# TYPE {metric} histogram")
+            for stage, histogram in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write the report as Prometheus text for *.prom files, JSON otherwise"""
+        report = self.to_prometheus() if path.endswith('.prom') else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(report)
+
+
+class Profiler:
+    """cProfile across the calling thread and every worker thread that calls enable_thread().
+
+    Before Python 3.12 a profile only sees the thread that enabled it, so
+    each worker gets its own profile and they are merged when stopped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._profiles = []
+        self._lock = threading.Lock()
+
+    def _enable(self):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: the first profile already covers every thread
+            return
+        with self._lock:
+            self._profiles.append(profile)
+
+    def enable_thread(self):
+        """ThreadPoolExecutor initializer that profiles the worker thread"""
+        self._enable()
+
+    def __enter__(self):
+        self._enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            profiles, self._profiles = self._profiles, []
+        for profile in profiles:
+            profile.disable()
+        if not profiles:
+            return False
+
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(self.path)
+
+        top = io.StringIO()
+        stats.stream = top
+        stats.sort_stats('cumulative').print_stats(15)
+        logging.getLogger(__name__).info("Profile written to %s\n%s", self.path, top.getvalue())
+        return False
+
+
+@contextlib.contextmanager
+def profiled(path):
+    """Profile the with-block when `path` is set; yields the Profiler or None"""
+    if not path:
+        yield None
+        return
+    with Profiler(path) as profiler:
+        yield profiler
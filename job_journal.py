@@ -0,0 +1,117 @@
+"""Append-only journal of a fetch job, so an interrupted run can be resumed"""
+import json
+import os
+import threading
+import time
+
+JOURNAL_FILENAME = '.transcripts_journal.jsonl'
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class JobJournal:
+    """Per-video job state as one JSON line per event in the output directory.
+
+    The first line describes the job (the fetcher options needed to repeat
+    it); every later line moves one video to PENDING, DONE or FAILED.
+    Replaying the file gives each video's latest state and its attempt count
+    across all runs. Lines are flushed as they are written, so killing the
+    process loses at most the line being written, which replay skips.
+    """
+
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, JOURNAL_FILENAME)
+        self.options = {}
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._file = None
+        self._replay()
+
+    @property
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def _replay(self):
+        if not self.exists:
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn last line from an interrupted write
+                    continue
+                if record.get('event') == 'job':
+                    self.options = record.get('options', {})
+                    self.entries = {}
+                elif 'id' in record:
+                    self._apply(record)
+
+    def _apply(self, record):
+        entry = self.entries.setdefault(record['id'], {'attempts': 0})
+        if 'video' in record:
+            entry['video'] = record['video']
+        entry['state'] = record['state']
+        entry['attempts'] += record.get('attempts', 0)
+        entry['error'] = record.get('error')
+        entry['error_class'] = record.get('error_class')
+
+    def _write(self, record):
+        with self._lock:
+            self._apply(record)
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._file.flush()
+
+    def start(self, options):
+        """Begin a new job, replacing the journal of the previous one"""
+        self.options = dict(options)
+        self.entries = {}
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.write(json.dumps({'event': 'job', 'time': time.time(), 'options': self.options}) + '\n')
+        self._file.flush()
+
+    def resume(self):
+        """Keep appending to the existing job"""
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if self._file.tell() and not self._ends_with_newline():
+            # Terminate a line torn by the interrupted run so it stays the only bad one
+            self._file.write('\n')
+            self._file.flush()
+
+    def _ends_with_newline(self):
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def unfinished(self):
+        """Videos that are still pending or failed, in the order they were queued"""
+        return [
+            entry['video'] for entry in self.entries.values()
+            if entry['state'] != DONE and 'video' in entry
+        ]
+
+    def pending(self, video):
+        self._write({'id': video['id'], 'state': PENDING, 'video': video})
+
+    def done(self, video, attempts=0):
+        self._write({'id': video['id'], 'state': DONE, 'attempts': attempts})
+
+    def failed(self, video, attempts, error, error_class):
+        self._write({
+            'id': video['id'], 'state': FAILED, 'attempts': attempts,
+            'error': str(error), 'error_class': error_class,
+        })
+
+    def attempts(self, video_id):
+        """Attempts made for a video over every run of this job"""
+        entry = self.entries.get(video_id)
+        return entry['attempts'] if entry else 0
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
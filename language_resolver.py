@@ -0,0 +1,113 @@
+"""Choose the best transcript track from a single listing"""
+from rate_limiter import PermanentError
+
+MANUAL = 'manual'
+GENERATED = 'generated'
+
+
+class NoMatchingTranscript(PermanentError):
+    """None of the listed tracks satisfies the language preferences"""
+
+
+def _track_attr(track, name):
+    """Tracks are youtube_transcript_api Transcript objects or cached dicts"""
+    if isinstance(track, dict):
+        return track.get(name)
+    return getattr(track, name, None)
+
+
+def _base_language(language_code):
+    return language_code.split('-')[0].lower()
+
+
+def track_key(language_code, is_generated, translated_to=None):
+    """Cache key of one track, e.g. 'en:manual', 'en:generated' or 'en:generated>de' for a translation"""
+    key = f"{language_code}:{GENERATED if is_generated else MANUAL}"
+    if translated_to:
+        key += f">{translated_to}"
+    return key
+
+
+def is_generated_key(key):
+    """True when a track_key() names an auto-generated track or a translation of one"""
+    return f":{GENERATED}" in key
+
+
+class LanguageResolver:
+    """Ranks every track of one listing and picks exactly one to fetch.
+
+    Earlier entries in `languages` win; an exact code ('en-GB') beats a
+    regional variant of the same language ('en' matching 'en-GB'); within a
+    language, manually created captions beat auto-generated ones unless
+    `prefer_manual` is False. When nothing matches, the first manual (then
+    generated) track is used if `fallback_to_any` is set. With
+    `translate_to`, the chosen track is machine-translated into that language
+    unless it already is in it.
+    """
+
+    def __init__(self, languages, prefer_manual=True, fallback_to_any=True, translate_to=None):
+        self.languages = [code.lower() for code in languages]
+        self.prefer_manual = prefer_manual
+        self.fallback_to_any = fallback_to_any
+        self.translate_to = translate_to
+
+    def _rank(self, track):
+        """Sort key for a track, or None with the reason it was rejected"""
+        language_code = (_track_attr(track, 'language_code') or '').lower()
+        generated = bool(_track_attr(track, 'is_generated'))
+        kind_rank = int(generated) if self.prefer_manual else int(not generated)
+
+        for preference, wanted in enumerate(self.languages):
+            if language_code == wanted:
+                return (preference, 0, kind_rank), f"preference #{preference + 1}"
+            if _base_language(language_code) == _base_language(wanted):
+                return (preference, 1, kind_rank), f"regional match for preference #{preference + 1}"
+
+        if self.fallback_to_any:
+            return (len(self.languages), 0, kind_rank), "no preferred language available"
+        return None, "not in the language preferences"
+
+    def resolve(self, tracks):
+        """Return (track, language_code, key, decisions) for the best track.
+
+        `key` is the track_key() of the transcript this yields, so manual,
+        generated and translated text never share a cache entry. `decisions`
+        explains, one line per track, why it was chosen or rejected. Raises
+        NoMatchingTranscript when nothing is acceptable.
+        """
+        ranked = []
+        decisions = []
+        for position, track in enumerate(tracks):
+            rank, reason = self._rank(track)
+            if rank is None:
+                decisions.append(self._describe(track, 'rejected', reason))
+            else:
+                ranked.append((rank, position, track, reason))
+
+        if not ranked:
+            raise NoMatchingTranscript(
+                "No transcript matches the language preferences: " + '; '.join(decisions or ['no tracks listed']))
+
+        ranked.sort(key=lambda item: item[:2])
+        _, _, chosen, reason = ranked[0]
+        decisions.insert(0, self._describe(chosen, 'chosen', reason))
+        for _, _, track, _ in ranked[1:]:
+            decisions.append(self._describe(track, 'rejected', f"outranked by {_track_attr(chosen, 'language_code')}"))
+
+        language_code = _track_attr(chosen, 'language_code')
+        key = track_key(language_code, _track_attr(chosen, 'is_generated'))
+        if self.translate_to and _base_language(language_code) != _base_language(self.translate_to):
+            if not _track_attr(chosen, 'is_translatable'):
+                raise NoMatchingTranscript(
+                    f"{language_code} transcript cannot be translated to {self.translate_to}")
+            decisions[0] += f", translated to {self.translate_to}"
+            key = track_key(language_code, _track_attr(chosen, 'is_generated'), self.translate_to)
+            if not isinstance(chosen, dict):
+                chosen = chosen.translate(self.translate_to)
+            language_code = self.translate_to
+
+        return chosen, language_code, key, decisions
+
+    def _describe(self, track, verdict, reason):
+        kind = GENERATED if _track_attr(track, 'is_generated') else MANUAL
+        return f"{_track_attr(track, 'language_code')} ({kind}): {verdict} - {reason}"
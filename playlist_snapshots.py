@@ -0,0 +1,172 @@
+"""Local snapshots of resolved playlists, so reloads are instant and changes can be diffed"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from transcript_cache import DEFAULT_CACHE_PATH
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(DEFAULT_CACHE_PATH), 'playlists.sqlite3')
+# Reloads within this many seconds are answered from the snapshot without asking YouTube
+DEFAULT_MAX_AGE = 60 * 60
+
+
+def diff_playlists(old_videos, new_videos):
+    """Compare two video lists by video ID.
+
+    Returns {'added', 'removed', 'renamed', 'unchanged'}: the added and
+    removed videos in playlist order, renamed ones as {'id', 'old_title',
+    'title'} and the number of videos present in both under the same title.
+    """
+    old_by_id = {video['id']: video for video in old_videos}
+    new_ids = {video['id'] for video in new_videos}
+
+    added = []
+    renamed = []
+    unchanged = 0
+    for video in new_videos:
+        old = old_by_id.get(video['id'])
+        if old is None:
+            added.append(video)
+        elif old['title'] != video['title']:
+            renamed.append({'id': video['id'], 'old_title': old['title'], 'title': video['title']})
+        else:
+            unchanged += 1
+
+    return {
+        'added': added,
+        'removed': [video for video in old_videos if video['id'] not in new_ids],
+        'renamed': renamed,
+        'unchanged': unchanged,
+    }
+
+
+def changed_ids(changes):
+    """IDs worth fetching after a reload: added and renamed videos"""
+    return {video['id'] for video in changes['added']} | {video['id'] for video in changes['renamed']}
+
+
+def describe_changes(changes):
+    """Short human-readable summary such as '3 new, 1 removed, 2 renamed'"""
+    if changes is None:
+        return "first snapshot"
+    parts = [f"{len(changes['added'])} new", f"{len(changes['removed'])} removed",
+             f"{len(changes['renamed'])} renamed"]
+    return ', '.join(parts)
+
+
+class PlaylistSnapshots:
+    """SQLite store holding the latest resolved entry list of each playlist.
+
+    A snapshot is {'id', 'title', 'videos', 'fetched_at', 'changes'}, where
+    `changes` is the diff_playlists() result against the snapshot it
+    replaced (None for the first one). get() ignores snapshots older than
+    `max_age` seconds so a stale listing never hides new uploads.
+
+    Separately, the baseline is the listing as of the last fetch that
+    covered it. Only fetches write it, so loading a playlist to look at it
+    never hides changes from the next `fetch --only-changed`.
+    """
+
+    def __init__(self, path=DEFAULT_SNAPSHOT_PATH, max_age=DEFAULT_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS snapshots ('
+            ' playlist_id TEXT PRIMARY KEY,'
+            ' title TEXT NOT NULL,'
+            ' video_count INTEGER NOT NULL,'
+            ' payload BLOB NOT NULL,'
+            ' fetched_at REAL NOT NULL)'
+        )
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS baselines ('
+            ' playlist_id TEXT PRIMARY KEY,'
+            ' payload BLOB NOT NULL,'
+            ' fetched_at REAL NOT NULL)'
+        )
+        self._conn.commit()
+
+    def latest(self, playlist_id):
+        """The most recent snapshot whatever its age, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT title, payload, fetched_at FROM snapshots WHERE playlist_id = ?', (playlist_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        title, payload, fetched_at = row
+        body = json.loads(zlib.decompress(payload))
+        return {
+            'id': playlist_id,
+            'title': title,
+            'videos': body['videos'],
+            'fetched_at': fetched_at,
+            'changes': body['changes'],
+        }
+
+    def get(self, playlist_id, max_age=None):
+        """The latest snapshot if it is younger than `max_age` (default: the store's), else None"""
+        max_age = self.max_age if max_age is None else max_age
+        snapshot = self.latest(playlist_id)
+        if snapshot is None or time.time() - snapshot['fetched_at'] > max_age:
+            return None
+        return snapshot
+
+    def save(self, playlist_id, title, videos):
+        """Store a freshly resolved playlist and return its snapshot, diffed against the previous one"""
+        previous = self.latest(playlist_id)
+        changes = diff_playlists(previous['videos'], videos) if previous is not None else None
+        fetched_at = time.time()
+        payload = zlib.compress(
+            json.dumps({'videos': videos, 'changes': changes}, ensure_ascii=False).encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?)',
+                (playlist_id, title, len(videos), payload, fetched_at)
+            )
+            self._conn.commit()
+        return {
+            'id': playlist_id,
+            'title': title,
+            'videos': videos,
+            'fetched_at': fetched_at,
+            'changes': changes,
+        }
+
+    def baseline(self, playlist_id):
+        """Videos of the playlist as of its last completed fetch, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT payload FROM baselines WHERE playlist_id = ?', (playlist_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    def save_baseline(self, playlist_id, videos, failed_ids=()):
+        """Record a finished fetch of `videos`; failed videos keep their previous state"""
+        failed_ids = set(failed_ids)
+        previous = {video['id']: video for video in self.baseline(playlist_id) or []}
+        # A failed new video stays absent and a failed renamed one keeps its old title, so both differ again
+        videos = [video for video in videos if video['id'] not in failed_ids]
+        videos += [previous[video_id] for video_id in failed_ids if video_id in previous]
+        payload = zlib.compress(json.dumps(videos, ensure_ascii=False).encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO baselines VALUES (?, ?, ?)', (playlist_id, payload, time.time()))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
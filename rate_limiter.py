@@ -0,0 +1,136 @@
+"""Shared rate limiting, backoff and error classification for transcript requests"""
+import random
+import threading
+import time
+
+import youtube_transcript_api
+
+# Error classes returned by classify_error()
+PERMANENT = 'permanent'
+THROTTLED = 'throttled'
+TRANSIENT = 'transient'
+
+DEFAULT_REQUESTS_PER_SECOND = 5.0
+DEFAULT_BURST = 10
+
+
+class PermanentError(Exception):
+    """Raised by our own code for failures that retrying cannot fix"""
+
+
+def _exception_types(*names):
+    """Collect the exception classes that exist in the installed youtube_transcript_api"""
+    return tuple(
+        getattr(youtube_transcript_api, name) for name in names
+        if hasattr(youtube_transcript_api, name)
+    )
+
+
+# Retrying these can never succeed
+PERMANENT_ERRORS = (PermanentError,) + _exception_types(
+    'NoTranscriptFound', 'TranscriptsDisabled', 'NoTranscriptAvailable',
+    'VideoUnavailable', 'InvalidVideoId', 'AgeRestricted', 'VideoUnplayable',
+    'NotTranslatable', 'TranslationLanguageNotAvailable',
+)
+
+# YouTube is telling us to slow down
+THROTTLE_ERRORS = _exception_types('TooManyRequests', 'RequestBlocked', 'IpBlocked')
+
+
+def classify_error(exc):
+    """Classify an exception as PERMANENT, THROTTLED or TRANSIENT"""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+
+        if isinstance(exc, THROTTLE_ERRORS):
+            return THROTTLED
+        if isinstance(exc, PERMANENT_ERRORS):
+            return PERMANENT
+
+        response = getattr(exc, 'response', None)
+        status_code = getattr(response, 'status_code', None)
+        if status_code == 429:
+            return THROTTLED
+        if status_code in (400, 404, 410):
+            return PERMANENT
+
+        # Only the status line itself: a bare '429' also turns up in video IDs and URLs
+        message = str(exc)
+        if 'HTTP Error 429' in message or 'Too Many Requests' in message:
+            return THROTTLED
+
+        exc = exc.__cause__ or exc.__context__
+
+    return TRANSIENT
+
+
+class BackoffPolicy:
+    """Exponential backoff with jitter"""
+
+    def __init__(self, base_delay=1.0, max_delay=60.0, max_attempts=3):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+
+    def delay(self, attempt):
+        """Return the sleep before retry number `attempt` (1-based)"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(ceiling / 2, ceiling)
+
+
+class RateLimiter:
+    """Token bucket shared by all workers, with adaptive rate and global backoff.
+
+    The refill rate is halved every time YouTube throttles us and creeps back
+    up towards the configured rate on each successful request.
+    """
+
+    def __init__(self, requests_per_second=DEFAULT_REQUESTS_PER_SECOND, burst=DEFAULT_BURST,
+                 backoff=None, min_rate=0.2):
+        self.max_rate = float(requests_per_second)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.rate = self.max_rate
+        self.capacity = float(max(1, burst))
+        self.backoff = backoff or BackoffPolicy()
+
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    def acquire(self):
+        """Block until the caller may make one request"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def record_success(self):
+        """Additively increase the rate after a successful request"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def record_throttle(self, attempt):
+        """Halve the rate and pause every worker; returns the pause in seconds"""
+        delay = self.backoff.delay(attempt)
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            # Tokens do not accumulate while paused
+            self._last_refill = self._paused_until
+        return delay
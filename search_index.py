@@ -0,0 +1,116 @@
+"""Full-text search over extracted transcript segments, backed by SQLite FTS5"""
+import os
+import sqlite3
+import threading
+import time
+
+INDEX_FILENAME = '.transcripts_index.sqlite3'
+DEFAULT_SEARCH_LIMIT = 20
+
+
+def deep_link(video_id, start):
+    """URL that opens the video at the given second"""
+    return f"https://www.youtube.com/watch?v={video_id}&t={int(start)}s"
+
+
+def plain_query(text):
+    """Turn free text into an FTS5 query that matches every word, ignoring FTS syntax"""
+    words = text.split()
+    return ' '.join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+class SearchIndex:
+    """Segment-level index: every row is one caption with its video ID and start time.
+
+    Segments live in an ordinary table; the FTS5 table indexes their text as
+    external content and is kept in sync by triggers, so re-indexing a video
+    is a cheap delete by video_id.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # The index usually sits in the output folder, so keep SQLite's default rollback journal:
+        # WAL does not work on network shares and leaves side files; this also converts WAL-mode indexes
+        self._conn.execute('PRAGMA journal_mode=DELETE')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS videos (
+                video_id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                language_code TEXT,
+                indexed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS segments (
+                id INTEGER PRIMARY KEY,
+                video_id TEXT NOT NULL,
+                start REAL NOT NULL,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS segments_video ON segments (video_id);
+            CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+                text, content='segments', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS segments_insert AFTER INSERT ON segments BEGIN
+                INSERT INTO segments_fts (rowid, text) VALUES (new.id, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS segments_delete AFTER DELETE ON segments BEGIN
+                INSERT INTO segments_fts (segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            END;
+        ''')
+        self._conn.commit()
+
+    def add_transcript(self, video, segments, language_code=None):
+        """Index (or re-index) one video's segments"""
+        rows = [(video['id'], segment['start'], segment['text']) for segment in segments]
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM segments WHERE video_id = ?', (video['id'],))
+            self._conn.execute(
+                'INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?)',
+                (video['id'], video['title'], language_code, time.time())
+            )
+            self._conn.executemany('INSERT INTO segments (video_id, start, text) VALUES (?, ?, ?)', rows)
+
+    def search(self, query, limit=DEFAULT_SEARCH_LIMIT, raw=False):
+        """Return the best matching segments, most relevant first.
+
+        `query` is free text unless `raw` is set, in which case it is passed
+        to FTS5 unchanged (phrases, prefix*, AND/OR/NOT, NEAR).
+        """
+        match = query if raw else plain_query(query)
+        if not match:
+            return []
+
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT s.video_id, v.title, s.start, s.text,
+                       snippet(segments_fts, 0, '[', ']', '...', 16), bm25(segments_fts) AS rank
+                FROM segments_fts
+                JOIN segments s ON s.id = segments_fts.rowid
+                JOIN videos v ON v.video_id = s.video_id
+                WHERE segments_fts MATCH ?
+                ORDER BY rank
+                LIMIT ?
+            ''', (match, limit)).fetchall()
+
+        return [
+            {
+                'video_id': video_id,
+                'title': title,
+                'start': start,
+                'text': text,
+                'snippet': snippet,
+                'score': -rank,
+                'url': deep_link(video_id, start),
+            }
+            for video_id, title, start, text, snippet, rank in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,107 @@
+"""Parsers for the subtitle formats yt-dlp can download (json3, srv3, vtt).
+
+Every parser returns the same segment dicts as transcript_core.normalize_segments:
+{'text': str, 'start': seconds, 'duration': seconds}.
+"""
+import io
+import json
+import re
+import xml.etree.ElementTree as ElementTree
+
+# Preferred download formats, most compact and easiest to parse first
+SUBTITLE_FORMATS = ('json3', 'srv3', 'vtt')
+
+_VTT_TAG = re.compile(r'<[^>]+>')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _clean(text):
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def parse_json3(data):
+    """Parse YouTube's json3 timed text"""
+    document = json.loads(data)
+    segments = []
+    for event in document.get('events', ()):
+        pieces = event.get('segs')
+        if not pieces:
+            continue
+        text = _clean(''.join(piece.get('utf8', '') for piece in pieces))
+        if not text:
+            continue
+        segments.append({
+            'text': text,
+            'start': event.get('tStartMs', 0) / 1000.0,
+            'duration': event.get('dDurationMs', 0) / 1000.0,
+        })
+    return segments
+
+
+def parse_srv3(data):
+    """Parse YouTube's srv3 (timedtext format 3) XML, one <p> element at a time"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    segments = []
+    for _, element in ElementTree.iterparse(io.BytesIO(data), events=('end',)):
+        if element.tag != 'p':
+            continue
+        text = _clean(''.join(element.itertext()))
+        if text:
+            segments.append({
+                'text': text,
+                'start': int(element.get('t', 0)) / 1000.0,
+                'duration': int(element.get('d', 0)) / 1000.0,
+            })
+        element.clear()
+    return segments
+
+
+def _vtt_seconds(timestamp):
+    parts = timestamp.replace(',', '.').split(':')
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def parse_vtt(data):
+    """Parse WebVTT line by line, dropping inline styling and karaoke timing tags"""
+    if isinstance(data, bytes):
+        data = data.decode('utf-8', errors='replace')
+    segments = []
+    start = end = None
+    lines = []
+
+    def flush():
+        text = _clean(_VTT_TAG.sub('', ' '.join(lines)))
+        if start is not None and text:
+            segments.append({'text': text, 'start': start, 'duration': max(0.0, end - start)})
+
+    for line in data.splitlines():
+        if '-->' in line:
+            flush()
+            lines = []
+            begin, _, rest = line.partition('-->')
+            start = _vtt_seconds(begin.strip())
+            end = _vtt_seconds(rest.strip().split()[0])
+        elif not line.strip():
+            flush()
+            start = None
+            lines = []
+        elif start is not None:
+            lines.append(line)
+    flush()
+    return segments
+
+
+PARSERS = {
+    'json3': parse_json3,
+    'srv3': parse_srv3,
+    'vtt': parse_vtt,
+}
+
+
+def parse_subtitles(data, subtitle_format):
+    """Parse downloaded subtitle content in one of SUBTITLE_FORMATS"""
+    return PARSERS[subtitle_format](data)
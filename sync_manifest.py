@@ -0,0 +1,109 @@
+"""Manifest of transcripts already written to an output directory, used for incremental sync"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+MANIFEST_FILENAME = '.transcripts_manifest.json'
+SAVE_EVERY = 25
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(title, language_code, segments, output_format='md'):
+    """Hash the parts of a transcript that end up in the output file"""
+    payload = json.dumps([title, language_code, segments, output_format], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SyncManifest:
+    """Maps video ID to output filename, language, content hash and fetch time.
+
+    The manifest lives in the output directory, so copying or moving the
+    directory keeps sync state with the files it describes.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_FILENAME)
+        self.entries = {}
+        self._dirty = 0
+        self._lock = threading.Lock()
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('videos', {})
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable manifest %s: %s", self.path, e)
+
+    def _exists(self, filename, exists):
+        if exists is not None:
+            return exists(filename)
+        return os.path.exists(os.path.join(self.output_dir, filename))
+
+    def is_current(self, video, extension=None, options=None, exists=None):
+        """True when the video's output exists and nothing about it is known to have changed.
+
+        `options` are the settings that shape the output file; an entry
+        recorded under different ones is not current. `exists(filename)`
+        overrides the check for outputs that are not plain files, such as
+        entries of a transcript archive.
+        """
+        entry = self.entries.get(video['id'])
+        if not entry or entry.get('title') != video['title']:
+            return False
+        if extension is not None and not entry['filename'].endswith(extension):
+            return False
+        if options is not None and entry.get('options') != options:
+            return False
+        return self._exists(entry['filename'], exists)
+
+    def is_unchanged(self, video_id, filename, digest, options=None, exists=None):
+        """True when `filename` already holds content with this hash, written under the same `options`"""
+        entry = self.entries.get(video_id)
+        return (
+            entry is not None
+            and entry['filename'] == filename
+            and entry['content_hash'] == digest
+            and (options is None or entry.get('options') == options)
+            and self._exists(filename, exists)
+        )
+
+    def record(self, video, filename, language_code, digest, options=None):
+        """Remember what was written for a video, removing its previous file if it was renamed"""
+        with self._lock:
+            previous = self.entries.get(video['id'])
+            # A different extension means another output format; leave that file alone
+            if (previous and previous['filename'] != filename
+                    and os.path.splitext(previous['filename'])[1] == os.path.splitext(filename)[1]):
+                old_path = os.path.join(self.output_dir, previous['filename'])
+                if os.path.exists(old_path):
+                    os.remove(old_path)
+
+            self.entries[video['id']] = {
+                'filename': filename,
+                'title': video['title'],
+                'language': language_code,
+                'content_hash': digest,
+                'options': options,
+                'fetched_at': time.time(),
+            }
+            self._dirty += 1
+            if self._dirty >= SAVE_EVERY:
+                self._save_locked()
+
+    def save(self):
+        """Write the manifest atomically if anything changed"""
+        with self._lock:
+            if self._dirty:
+                self._save_locked()
+
+    def _save_locked(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'videos': self.entries}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+        self._dirty = 0
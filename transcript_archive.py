@@ -0,0 +1,162 @@
+"""Single-file archive output: every transcript of a directory in one compressed SQLite bundle"""
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_FILENAME = 'transcripts.sqlite3'
+DEFAULT_BATCH_SIZE = 50
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+
+
+def _compress(text):
+    """Return (codec, blob), preferring zstd when the zstandard package is installed"""
+    data = text.encode('utf-8')
+    if zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return 'zlib', zlib.compress(data, ZLIB_LEVEL)
+
+
+def _decompress(codec, blob):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("This archive entry is zstd-compressed; install the zstandard package to read it")
+        data = zstandard.ZstdDecompressor().decompress(blob)
+    else:
+        data = zlib.decompress(blob)
+    return data.decode('utf-8')
+
+
+class TranscriptArchive:
+    """Formatted transcripts stored as compressed rows keyed by video ID.
+
+    One file replaces thousands of small ones, so network file systems and
+    backups see a single growing file. Rows are buffered and written
+    `batch_size` at a time in one transaction; `filename` keeps the name the
+    transcript would have had on disk, for extracting it later. An
+    `on_commit` callback passed to add() runs once the row is durable.
+    """
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # The archive sits in the output folder, which may be a network share where WAL does not work;
+        # setting the default rollback journal explicitly also converts archives written in WAL mode
+        self._conn.execute('PRAGMA journal_mode=DELETE')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS transcripts (
+                video_id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                language_code TEXT,
+                output_format TEXT NOT NULL,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                content BLOB NOT NULL,
+                written_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS transcripts_filename ON transcripts (filename);
+        ''')
+        self._conn.commit()
+
+    def add(self, video, filename, language_code, output_format, chunks, on_commit=None):
+        """Queue one formatted transcript (an iterable of text chunks) for the next batch"""
+        text = ''.join(chunks)
+        codec, blob = _compress(text)
+        row = (video['id'], video['title'], filename, language_code, output_format,
+               codec, len(text), blob, time.time())
+        with self._lock:
+            self._pending[video['id']] = (row, on_commit)
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [row for row, _ in self._pending.values()]
+            )
+        pending, self._pending = self._pending, {}
+        for _, on_commit in pending.values():
+            if on_commit is not None:
+                on_commit()
+
+    def has_file(self, filename):
+        """True when a transcript stored under `filename` is in the archive (or queued for it)"""
+        with self._lock:
+            if any(row[2] == filename for row, _ in self._pending.values()):
+                return True
+            row = self._conn.execute(
+                'SELECT 1 FROM transcripts WHERE filename = ? LIMIT 1', (filename,)
+            ).fetchone()
+        return row is not None
+
+    def get(self, video_id):
+        """Return the stored transcript as a dict with its text in 'content', or None"""
+        with self._lock:
+            if video_id in self._pending:
+                row = self._pending[video_id][0]
+            else:
+                row = self._conn.execute(
+                    'SELECT * FROM transcripts WHERE video_id = ?', (video_id,)
+                ).fetchone()
+        if row is None:
+            return None
+        video_id, title, filename, language_code, output_format, codec, size, blob, written_at = row
+        return {
+            'video_id': video_id,
+            'title': title,
+            'filename': filename,
+            'language_code': language_code,
+            'output_format': output_format,
+            'size': size,
+            'written_at': written_at,
+            'content': _decompress(codec, blob),
+        }
+
+    def entries(self):
+        """Metadata of every stored transcript, without decompressing anything"""
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT video_id, title, filename, language_code, output_format, size, written_at '
+                'FROM transcripts ORDER BY filename'
+            ).fetchall()
+        return [
+            {
+                'video_id': video_id,
+                'title': title,
+                'filename': filename,
+                'language_code': language_code,
+                'output_format': output_format,
+                'size': size,
+                'written_at': written_at,
+            }
+            for video_id, title, filename, language_code, output_format, size, written_at in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
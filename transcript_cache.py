@@ -0,0 +1,127 @@
+"""Persistent on-disk cache for transcript segments and track listings"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.expanduser('~'), '.cache', 'youtube_transcript_extractor', 'transcripts.sqlite3')
+DEFAULT_TTL = 7 * 24 * 60 * 60
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Listings are stored in the same table as segments under this pseudo language code
+_LISTING_KEY = '__listing__'
+
+
+class TranscriptCache:
+    """SQLite-backed cache keyed by (video_id, track key).
+
+    Track keys come from language_resolver.track_key() and tell manual,
+    auto-generated and translated text apart ('en:manual', 'en:generated',
+    'en:generated>de'); the column keeps its historical name language_code.
+
+    Entries older than `ttl` seconds are treated as missing, and the least
+    recently used entries are evicted once the payloads exceed `max_bytes`.
+    With `bypass=True` nothing is read from the cache, but fresh results are
+    still stored so the next run benefits from them.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, bypass=False):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bypass = bypass
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' video_id TEXT NOT NULL,'
+            ' language_code TEXT NOT NULL,'
+            ' payload BLOB NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' fetched_at REAL NOT NULL,'
+            ' accessed_at REAL NOT NULL,'
+            ' PRIMARY KEY (video_id, language_code))'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS entries_lru ON entries (accessed_at)')
+        self._conn.commit()
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def _get(self, video_id, key):
+        if self.bypass:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT payload, fetched_at FROM entries WHERE video_id = ? AND language_code = ?',
+                (video_id, key)
+            ).fetchone()
+            if row is None:
+                return None
+            payload, fetched_at = row
+            if self.ttl is not None and time.time() - fetched_at > self.ttl:
+                return None
+            self._conn.execute(
+                'UPDATE entries SET accessed_at = ? WHERE video_id = ? AND language_code = ?',
+                (time.time(), video_id, key)
+            )
+            self._conn.commit()
+        return json.loads(zlib.decompress(payload))
+
+    def _put(self, video_id, key, value):
+        payload = zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT size FROM entries WHERE video_id = ? AND language_code = ?',
+                (video_id, key)
+            ).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)',
+                (video_id, key, payload, len(payload), now, now)
+            )
+            self._total_bytes += len(payload) - (row[0] if row else 0)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        if self.max_bytes is None or self._total_bytes <= self.max_bytes:
+            return
+        cursor = self._conn.execute(
+            'SELECT video_id, language_code, size FROM entries ORDER BY accessed_at')
+        victims = []
+        for video_id, key, size in cursor:
+            if self._total_bytes <= self.max_bytes:
+                break
+            victims.append((video_id, key))
+            self._total_bytes -= size
+        self._conn.executemany(
+            'DELETE FROM entries WHERE video_id = ? AND language_code = ?', victims)
+
+    def get_transcript(self, video_id, key):
+        """Return cached segments of the track with this track key as a list of dicts, or None"""
+        return self._get(video_id, key)
+
+    def put_transcript(self, video_id, key, segments):
+        """Store segments (a list of {'text', 'start', 'duration'} dicts) under a track key"""
+        self._put(video_id, key, segments)
+
+    def get_listing(self, video_id):
+        """Return the cached list of available transcript tracks, or None"""
+        return self._get(video_id, _LISTING_KEY)
+
+    def put_listing(self, video_id, tracks):
+        """Store the available transcript tracks for a video"""
+        self._put(video_id, _LISTING_KEY, tracks)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
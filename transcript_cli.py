@@ -0,0 +1,327 @@
+"""Headless command line entry point for the transcript extractor.
+
+Example:
+    python transcript_cli.py fetch "https://www.youtube.com/playlist?list=..." -o transcripts -j 8
+
+Progress goes to stderr; a JSON summary is printed to stdout when the run
+finishes. Exit status is 0 when every transcript was saved, 1 when some
+failed and 2 for invalid input.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+
+from transcript_core import (
+    fetch_playlists, TranscriptFetcher, DEFAULT_MAX_WORKERS, DEFAULT_PLAYLIST_RESOLVERS, PREFERRED_LANGUAGES,
+    STATUS_WARNING, STATUS_ERROR
+)
+from rate_limiter import DEFAULT_REQUESTS_PER_SECOND
+from transcript_formats import FORMATS, DEFAULT_FORMAT, format_timestamp
+from search_index import SearchIndex, INDEX_FILENAME, DEFAULT_SEARCH_LIMIT
+from job_journal import JobJournal, JOURNAL_FILENAME
+from file_naming import NAMING_SCHEMES, DEFAULT_NAMING
+from transcript_archive import TranscriptArchive, ARCHIVE_FILENAME
+from playlist_snapshots import PlaylistSnapshots, DEFAULT_SNAPSHOT_PATH
+from transcript_postprocess import MERGE_MODES, DEFAULT_MERGE, MERGE_LIMITS
+from instrumentation import Metrics, configure_logging, profiled, LOG_FORMATS, DEFAULT_LOG_LEVEL
+
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_USAGE = 2
+
+# Status callbacks become log records, so --log-format json covers them too
+STATUS_LOG_LEVELS = {STATUS_WARNING: logging.WARNING, STATUS_ERROR: logging.ERROR}
+
+logger = logging.getLogger('transcript_cli')
+
+
+def read_url_file(path):
+    """Read playlist URLs from a file, one per line; blank lines and # comments are ignored"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+def print_status(message, level):
+    logger.log(STATUS_LOG_LEVELS.get(level, logging.INFO), message, extra={'status': level})
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='transcript_cli.py',
+        description='Extract transcripts from YouTube playlists without the GUI.')
+    parser.add_argument('--log-level', default=DEFAULT_LOG_LEVEL,
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], type=str.upper,
+                        help='log verbosity on stderr (default: %(default)s)')
+    parser.add_argument('--log-format', choices=LOG_FORMATS, default='text',
+                        help='plain text or one JSON object per log line (default: %(default)s)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    fetch = subparsers.add_parser('fetch', help='fetch transcripts for one or more playlists')
+    fetch.add_argument('urls', nargs='*', metavar='URL', help='playlist URL')
+    fetch.add_argument('-f', '--url-file', action='append', default=[],
+                       help='file with one playlist URL per line (may be repeated)')
+    fetch.add_argument('-o', '--output-dir', required=True, help='directory to write transcripts to')
+    fetch.add_argument('-j', '--workers', type=int, default=DEFAULT_MAX_WORKERS,
+                       help=f'concurrent fetch workers (default: {DEFAULT_MAX_WORKERS})')
+    fetch.add_argument('-l', '--languages', default=','.join(PREFERRED_LANGUAGES),
+                       help='comma-separated language preference (default: %(default)s)')
+    fetch.add_argument('--prefer-generated', action='store_true',
+                       help='prefer auto-generated captions over manual ones in the same language')
+    fetch.add_argument('--only-preferred', action='store_true',
+                       help='fail instead of falling back to a language outside --languages')
+    fetch.add_argument('--translate-to', metavar='LANG',
+                       help='machine-translate transcripts into this language when needed')
+    fetch.add_argument('--rate', type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                       help='maximum transcript requests per second (default: %(default)s)')
+    fetch.add_argument('--no-cache', action='store_true', help='ignore cached transcripts')
+    fetch.add_argument('--proxy', action='append', dest='proxies', metavar='URL',
+                       help='HTTP(S) proxy to send requests through; repeat to rotate between '
+                            'several proxies whenever YouTube throttles')
+    fetch.add_argument('--no-fallback', action='store_true',
+                       help='do not fall back to yt-dlp subtitles when the transcript API is throttled')
+    fetch.add_argument('--sync', action='store_true', help='only fetch new or changed videos')
+    fetch.add_argument('--only-changed', action='store_true',
+                       help='only fetch videos added to or renamed in each playlist since its last '
+                            f'fetch, retrying ones that failed (state is kept in {DEFAULT_SNAPSHOT_PATH})')
+    fetch.add_argument('--format', dest='output_format', choices=list(FORMATS), default=DEFAULT_FORMAT,
+                       help='output file format (default: %(default)s)')
+    fetch.add_argument('--naming', choices=NAMING_SCHEMES, default=DEFAULT_NAMING,
+                       help="file names: 'title' (video ID added only on a clash), 'title-id' "
+                            "or 'index' (playlist position first) (default: %(default)s)")
+    fetch.add_argument('--merge', choices=MERGE_MODES, default=DEFAULT_MERGE,
+                       help="join captions into 'sentence' or 'paragraph' chunks (default: %(default)s)")
+    fetch.add_argument('--chunk-seconds', type=float, metavar='SECONDS',
+                       help='time window of a merged chunk (default: %s for sentences, %s for paragraphs)'
+                            % (MERGE_LIMITS['sentence'][0], MERGE_LIMITS['paragraph'][0]))
+    fetch.add_argument('--chunk-words', type=int, metavar='WORDS',
+                       help='word budget of a merged chunk (default: %s for sentences, %s for paragraphs)'
+                            % (MERGE_LIMITS['sentence'][1], MERGE_LIMITS['paragraph'][1]))
+    fetch.add_argument('--keep-duplicates', action='store_true',
+                       help='keep the text auto-generated captions repeat from the caption before')
+    fetch.add_argument('--archive', action='store_true',
+                       help=f'store transcripts in one compressed {ARCHIVE_FILENAME} per output folder '
+                            'instead of one file per video')
+    fetch.add_argument('--flat', action='store_true',
+                       help='write every playlist straight into the output directory '
+                            '(default when only one playlist is given)')
+    fetch.add_argument('--resolvers', type=int, default=DEFAULT_PLAYLIST_RESOLVERS,
+                       help='playlists to resolve concurrently (default: %(default)s)')
+    fetch.add_argument('--index', nargs='?', const='', default=None, metavar='PATH',
+                       help=f'add fetched transcripts to a full-text search index '
+                            f'(default path: OUTPUT_DIR/{INDEX_FILENAME})')
+
+    resume = subparsers.add_parser(
+        'resume', help='retry the failed and unfinished videos of an interrupted fetch')
+    resume.add_argument('-o', '--output-dir', required=True, help=f'directory containing {JOURNAL_FILENAME}')
+    resume.add_argument('-j', '--workers', type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f'concurrent fetch workers (default: {DEFAULT_MAX_WORKERS})')
+    resume.add_argument('--rate', type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help='maximum transcript requests per second (default: %(default)s)')
+    resume.add_argument('--no-cache', action='store_true', help='ignore cached transcripts')
+    resume.add_argument('--proxy', action='append', dest='proxies', metavar='URL',
+                        help='HTTP(S) proxy to send requests through (may be repeated)')
+
+    for command in (fetch, resume):
+        command.add_argument('--metrics', metavar='PATH',
+                             help='write request counters and stage timings to PATH '
+                                  '(Prometheus text for *.prom, JSON otherwise)')
+        command.add_argument('--profile', metavar='PATH', help='write a cProfile dump of the run to PATH')
+
+    archive = subparsers.add_parser('archive', help='list, print or extract transcripts from fetch --archive')
+    archive.add_argument('path', help=f'{ARCHIVE_FILENAME} or the folder containing it')
+    archive.add_argument('video_ids', nargs='*', metavar='VIDEO_ID', help='print these transcripts')
+    archive.add_argument('--extract', metavar='DIR',
+                         help='write the transcripts (all of them unless VIDEO_IDs are given) to DIR as files')
+
+    search = subparsers.add_parser('search', help='search transcripts indexed with fetch --index')
+    search.add_argument('query', help='words to search for')
+    location = search.add_mutually_exclusive_group(required=True)
+    location.add_argument('-o', '--output-dir', help=f'directory containing {INDEX_FILENAME}')
+    location.add_argument('--index', metavar='PATH', help='path to the index file')
+    search.add_argument('-n', '--limit', type=int, default=DEFAULT_SEARCH_LIMIT,
+                        help='maximum number of hits (default: %(default)s)')
+    search.add_argument('--raw', action='store_true',
+                        help='pass the query to SQLite FTS5 unchanged (phrases, prefix*, OR, NEAR)')
+    search.add_argument('--json', action='store_true', help='print hits as JSON')
+
+    return parser
+
+
+def run_fetch(args, metrics, profiler):
+    urls = list(args.urls)
+    for path in args.url_file:
+        urls.extend(read_url_file(path))
+    if not urls:
+        print("error: no playlist URLs given", file=sys.stderr)
+        return EXIT_USAGE, None
+    if args.workers < 1:
+        print("error: --workers must be at least 1", file=sys.stderr)
+        return EXIT_USAGE, None
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    languages = [code.strip() for code in args.languages.split(',') if code.strip()]
+    index_path = args.index
+    if index_path == '':
+        index_path = os.path.join(args.output_dir, INDEX_FILENAME)
+
+    snapshots = PlaylistSnapshots() if args.only_changed else None
+    try:
+        summary = fetch_playlists(
+            urls,
+            args.output_dir,
+            per_playlist_dirs=False if args.flat else None,
+            max_resolvers=args.resolvers,
+            snapshots=snapshots,
+            only_changed=args.only_changed,
+            max_workers=args.workers,
+            languages=languages,
+            prefer_manual=not args.prefer_generated,
+            only_preferred=args.only_preferred,
+            translate_to=args.translate_to,
+            bypass_cache=args.no_cache,
+            sync_mode=args.sync,
+            output_format=args.output_format,
+            naming=args.naming,
+            archive=args.archive,
+            dedupe=not args.keep_duplicates,
+            merge=args.merge,
+            chunk_seconds=args.chunk_seconds,
+            chunk_words=args.chunk_words,
+            index_path=index_path,
+            use_fallback=not args.no_fallback,
+            proxies=args.proxies,
+            requests_per_second=args.rate,
+            on_status=print_status,
+            metrics=metrics,
+            profiler=profiler,
+        )
+    finally:
+        if snapshots is not None:
+            snapshots.close()
+
+    exit_code = EXIT_OK
+    if summary['failed'] or any('error' in playlist for playlist in summary['playlists']):
+        exit_code = EXIT_FAILURES
+    return exit_code, summary
+
+
+def run_resume(args, metrics, profiler):
+    journal = JobJournal(args.output_dir)
+    if not journal.exists:
+        print(f"error: no job journal in {args.output_dir}", file=sys.stderr)
+        return EXIT_USAGE, None
+    if args.workers < 1:
+        print("error: --workers must be at least 1", file=sys.stderr)
+        return EXIT_USAGE, None
+
+    videos = journal.unfinished()
+    logger.info("Resuming %d unfinished videos from %s", len(videos), journal.path)
+    fetcher = TranscriptFetcher(
+        args.output_dir,
+        resume=True,
+        max_workers=args.workers,
+        bypass_cache=args.no_cache,
+        proxies=args.proxies,
+        requests_per_second=args.rate,
+        on_status=print_status,
+        metrics=metrics,
+        profiler=profiler,
+        **journal.options
+    )
+    summary = fetcher.run(videos)
+    return (EXIT_FAILURES if summary['failed'] else EXIT_OK), summary
+
+
+def run_archive(args):
+    path = args.path
+    if os.path.isdir(path):
+        path = os.path.join(path, ARCHIVE_FILENAME)
+    if not os.path.exists(path):
+        print(f"error: no transcript archive at {path}", file=sys.stderr)
+        return EXIT_USAGE
+
+    archive = TranscriptArchive(path)
+    try:
+        if args.extract:
+            os.makedirs(args.extract, exist_ok=True)
+            video_ids = args.video_ids or [entry['video_id'] for entry in archive.entries()]
+        elif args.video_ids:
+            video_ids = args.video_ids
+        else:
+            for entry in archive.entries():
+                print(f"{entry['video_id']}\t{entry['output_format']}\t{entry['size']}\t{entry['filename']}")
+            return EXIT_OK
+
+        missing = 0
+        for video_id in video_ids:
+            transcript = archive.get(video_id)
+            if transcript is None:
+                print(f"error: {video_id} is not in the archive", file=sys.stderr)
+                missing += 1
+            elif args.extract:
+                with open(os.path.join(args.extract, transcript['filename']), 'w', encoding='utf-8') as f:
+                    f.write(transcript['content'])
+            else:
+                sys.stdout.write(transcript['content'])
+    finally:
+        archive.close()
+    return EXIT_FAILURES if missing else EXIT_OK
+
+
+def run_search(args):
+    index_path = args.index or os.path.join(args.output_dir, INDEX_FILENAME)
+    if not os.path.exists(index_path):
+        print(f"error: no search index at {index_path}", file=sys.stderr)
+        return EXIT_USAGE
+
+    index = SearchIndex(index_path)
+    try:
+        hits = index.search(args.query, limit=args.limit, raw=args.raw)
+    except sqlite3.OperationalError as e:
+        print(f"error: invalid query: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    finally:
+        index.close()
+
+    if args.json:
+        print(json.dumps(hits, ensure_ascii=False))
+    else:
+        for hit in hits:
+            print(f"[{format_timestamp(hit['start'])}] {hit['title']}")
+            print(f"    {hit['snippet']}")
+            print(f"    {hit['url']}")
+    return EXIT_OK if hits else EXIT_FAILURES
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    configure_logging(args.log_level, args.log_format)
+
+    if args.command == 'search':
+        return run_search(args)
+    if args.command == 'archive':
+        return run_archive(args)
+
+    # Keep stdout clean for the JSON summary; library chatter goes to stderr
+    metrics = Metrics()
+    with contextlib.redirect_stdout(sys.stderr), profiled(args.profile) as profiler:
+        if args.command == 'resume':
+            exit_code, result = run_resume(args, metrics, profiler)
+        else:
+            exit_code, result = run_fetch(args, metrics, profiler)
+
+    if args.metrics and result is not None:
+        metrics.write(args.metrics)
+
+    if result is not None:
+        result['exit_code'] = exit_code
+        print(json.dumps(result, ensure_ascii=False))
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,951 @@
+"""GUI-free playlist loading, transcript fetching, formatting and writing.
+
+Nothing in here imports tkinter, so it can run on headless machines (see
+transcript_cli.py). Progress is reported through optional callbacks.
+"""
+import functools
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from rate_limiter import (
+    RateLimiter, BackoffPolicy, PermanentError, classify_error, PERMANENT, THROTTLED, DEFAULT_REQUESTS_PER_SECOND
+)
+from transcript_cache import TranscriptCache, DEFAULT_CACHE_PATH
+from sync_manifest import SyncManifest, content_hash
+from transcript_formats import DEFAULT_FORMAT, write_transcript, iter_transcript, file_extension
+from transcript_archive import TranscriptArchive, ARCHIVE_FILENAME
+from search_index import SearchIndex
+from subtitle_parsers import SUBTITLE_FORMATS, parse_subtitles
+from connection_pool import ConnectionPool, DEFAULT_POOL_SIZE
+from language_resolver import LanguageResolver, NoMatchingTranscript, track_key, is_generated_key
+from job_journal import JobJournal
+from instrumentation import Metrics
+from file_naming import FilenameRegistry, sanitize_filename, candidate_names, DEFAULT_NAMING
+from playlist_snapshots import changed_ids, describe_changes, diff_playlists
+from transcript_postprocess import postprocess_segments, DEFAULT_MERGE
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_PLAYLIST_RESOLVERS = 4
+# How long to route new videos to the yt-dlp backend after the primary one is throttled
+FAILOVER_COOLDOWN = 120
+MAX_RETRY_ATTEMPTS = 3
+PREFERRED_LANGUAGES = ['hi', 'en']
+
+# Status levels passed to on_status callbacks
+STATUS_INFO = 'info'
+STATUS_WORKING = 'working'
+STATUS_WARNING = 'warning'
+STATUS_ERROR = 'error'
+STATUS_SUCCESS = 'success'
+
+# Job options that change what ends up in an output file; sync redoes videos written under others
+OUTPUT_OPTIONS = ('languages', 'prefer_manual', 'only_preferred', 'translate_to', 'output_format', 'naming',
+                  'archive', 'dedupe', 'merge', 'chunk_seconds', 'chunk_words')
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_segments(transcript_data):
+    """Convert fetched transcript entries (dicts or snippet objects) to plain dicts"""
+    segments = []
+    for entry in transcript_data:
+        if isinstance(entry, dict):
+            segments.append({
+                'text': entry.get('text', ''),
+                'start': entry.get('start', 0),
+                'duration': entry.get('duration', 0),
+            })
+        else:
+            segments.append({
+                'text': getattr(entry, 'text', ''),
+                'start': getattr(entry, 'start', 0),
+                'duration': getattr(entry, 'duration', 0),
+            })
+    return segments
+
+
+def describe_tracks(transcript_list):
+    """Summarize the tracks of a TranscriptList so they can be cached"""
+    return [
+        {
+            'language_code': transcript.language_code,
+            'language': transcript.language,
+            'is_generated': transcript.is_generated,
+            'is_translatable': transcript.is_translatable,
+        }
+        for transcript in transcript_list
+    ]
+
+
+def extract_playlist_id(url):
+    """Extract playlist ID from YouTube URL"""
+    try:
+        logger.debug("extract_playlist_id: Received URL: %s", url)
+        parsed_url = urlparse(url)
+        logger.debug("extract_playlist_id: Parsed netloc: %s", parsed_url.netloc)
+        playlist_id_to_return = None
+        if 'youtube.com' in parsed_url.netloc:
+            query_params = parse_qs(parsed_url.query)
+            if 'list' in query_params:
+                playlist_id_to_return = query_params['list'][0]
+        elif 'youtu.be' in parsed_url.netloc:
+            query_params = parse_qs(parsed_url.query)
+            if 'list' in query_params:
+                playlist_id_to_return = query_params['list'][0]
+        logger.debug("extract_playlist_id: Extracted ID: %s", playlist_id_to_return)
+        return playlist_id_to_return
+    except Exception as e:
+        logger.warning("Error extracting playlist ID: %s", e)
+        return None
+
+
+class PlaylistStream:
+    """Iterate a playlist's videos page by page as yt-dlp resolves them.
+
+    There is no cap on the number of entries, and callers can start working
+    on the first videos while later pages are still being fetched. `title`
+    is filled in once iteration has started. Pass `ydl` to resolve the
+    playlist with an existing YoutubeDL (or a stand-in) instead of a new one.
+    """
+
+    def __init__(self, url, ydl=None):
+        self.url = url
+        self.ydl = ydl
+        self.id = extract_playlist_id(url)
+        if not self.id:
+            raise ValueError(f"Invalid playlist URL: {url}")
+        self.title = self.id
+        self.count = 0
+
+    def __iter__(self):
+        if self.ydl is not None:
+            yield from self._iter_entries(self.ydl)
+            return
+
+        # yt-dlp is slow to import and only needed here, so keep it off the startup path
+        import yt_dlp
+
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': 'in_playlist',
+        }
+
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            yield from self._iter_entries(ydl)
+
+    def _iter_entries(self, ydl):
+        # process=False leaves 'entries' as a lazy generator that pages on demand
+        playlist_info = ydl.extract_info(
+            f'https://www.youtube.com/playlist?list={self.id}',
+            download=False,
+            process=False
+        ) or {}
+        self.title = playlist_info.get('title') or self.id
+
+        for entry in playlist_info.get('entries') or []:
+            if entry:
+                self.count += 1
+                yield {
+                    'id': entry.get('id', ''),
+                    'title': entry.get('title') or 'Unknown Title',
+                    'url': entry.get('url', f"https://www.youtube.com/watch?v={entry.get('id', '')}"),
+                    'playlist_index': self.count,
+                    'duration': entry.get('duration'),
+                }
+
+
+def load_playlist(url, snapshots=None, refresh=False, on_entry=None):
+    """Resolve a whole playlist to {'id', 'title', 'videos'}; raises ValueError for bad URLs.
+
+    With a PlaylistSnapshots store a fresh snapshot is returned without any
+    network call unless `refresh` is set, and every resolved listing is
+    saved; the result then also has 'fetched_at', 'changes' (the diff
+    against the previous snapshot, None for the first) and 'cached'.
+    `on_entry` is called with the running count as entries page in.
+    """
+    stream = PlaylistStream(url)
+    if snapshots is not None and not refresh:
+        snapshot = snapshots.get(stream.id)
+        if snapshot is not None:
+            return dict(snapshot, cached=True)
+
+    videos = []
+    for video in stream:
+        videos.append(video)
+        if on_entry:
+            on_entry(len(videos))
+
+    if snapshots is None:
+        return {
+            'id': stream.id,
+            'title': stream.title,
+            'videos': videos,
+        }
+    return dict(snapshots.save(stream.id, stream.title, videos), cached=False)
+
+
+def _is_translation(formats):
+    """yt-dlp lists machine translations of the spoken-language track with a tlang URL parameter"""
+    return any('tlang' in parse_qs(urlparse(entry.get('url') or '').query) for entry in formats)
+
+
+def describe_yt_dlp_tracks(info):
+    """Split yt-dlp info into (real tracks as LanguageResolver dicts, machine translations by language).
+
+    Automatic captions list the spoken-language ASR track as '<code>-orig'
+    (or, in older yt-dlp, as the one code without a tlang URL) next to a
+    translation of it into every other language; only the former is a track.
+    """
+    tracks = []
+    for language_code, formats in (info.get('subtitles') or {}).items():
+        if formats and language_code != 'live_chat':
+            tracks.append({'language_code': language_code, 'is_generated': False, 'formats': formats})
+
+    generated = {}
+    translations = {}
+    for language_code, formats in (info.get('automatic_captions') or {}).items():
+        if not formats:
+            continue
+        if language_code.endswith('-orig'):
+            generated[language_code[:-len('-orig')]] = formats
+        elif _is_translation(formats):
+            translations[language_code] = formats
+        else:
+            generated.setdefault(language_code, formats)
+    tracks += [
+        {'language_code': language_code, 'is_generated': True, 'formats': formats}
+        for language_code, formats in generated.items()
+    ]
+
+    for track in tracks:
+        track['is_translatable'] = bool(translations)
+    return tracks, translations
+
+
+def choose_yt_dlp_track(info, resolver):
+    """Pick (language_code, formats, cache key) from yt-dlp info with the same LanguageResolver as the primary API"""
+    tracks, translations = describe_yt_dlp_tracks(info)
+    if not tracks:
+        return None, None, None
+
+    track, language_code, key, decisions = resolver.resolve(tracks)
+    for decision in decisions:
+        logger.debug("yt-dlp track %s", decision)
+    if language_code == track['language_code']:
+        return language_code, track['formats'], key
+
+    # translate_to: yt-dlp only offers translations of the spoken-language automatic track
+    formats = translations.get(language_code)
+    if not formats:
+        raise NoMatchingTranscript(f"yt-dlp offers no {language_code} translation")
+    source = next((candidate['language_code'] for candidate in tracks if candidate['is_generated']),
+                  track['language_code'])
+    return language_code, formats, track_key(source, True, language_code)
+
+
+def parse_yt_dlp_subtitles(subtitle_info, ydl):
+    """Download the most compact available format of a subtitle track and parse it"""
+    formats = {entry.get('ext'): entry for entry in subtitle_info if entry.get('url')}
+    for subtitle_format in SUBTITLE_FORMATS:
+        if subtitle_format in formats:
+            response = ydl.urlopen(formats[subtitle_format]['url'])
+            try:
+                data = response.read()
+            finally:
+                response.close()
+            return parse_subtitles(data, subtitle_format)
+    raise PermanentError(f"No supported subtitle format among {sorted(formats)}")
+
+
+def get_transcript_with_yt_dlp(video_id, languages=None, rate_limiter=None, ydl=None, resolver=None, cache=None):
+    """Alternative method to get transcript using yt-dlp; returns (segments, language_code, cache key).
+
+    Pass a long-lived `ydl` to skip extractor initialization on every video,
+    the fetcher's `resolver` so both backends choose the same track, and a
+    TranscriptCache to store the track listing for later cache lookups.
+    """
+    if ydl is None:
+        import yt_dlp
+
+        ydl_opts = {
+            'skip_download': True,
+            'quiet': True,
+            'no_warnings': True,
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            return get_transcript_with_yt_dlp(video_id, languages, rate_limiter, ydl, resolver, cache)
+
+    if resolver is None:
+        resolver = LanguageResolver(list(languages or PREFERRED_LANGUAGES))
+    if rate_limiter:
+        rate_limiter.acquire()
+    info = ydl.extract_info(f'https://www.youtube.com/watch?v={video_id}', download=False)
+
+    info = info or {}
+    if cache is not None:
+        tracks, _ = describe_yt_dlp_tracks(info)
+        if tracks:
+            cache.put_listing(video_id, [
+                {field: track[field] for field in ('language_code', 'is_generated', 'is_translatable')}
+                for track in tracks
+            ])
+
+    language_code, subtitle_info, key = choose_yt_dlp_track(info, resolver)
+    if not language_code:
+        raise PermanentError(f"No subtitles available for {video_id}")
+
+    if rate_limiter:
+        rate_limiter.acquire()
+    return parse_yt_dlp_subtitles(subtitle_info, ydl), language_code, key
+
+
+def link_or_copy(source, destination):
+    """Hard-link `source` to `destination`, copying when links are not supported"""
+    if os.path.exists(destination):
+        if os.path.samefile(source, destination):
+            return
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+class TranscriptFetcher:
+    """Fetches, formats and saves transcripts for a list of videos with a pool of workers.
+
+    A video is written to `output_dir` unless it carries an 'output_dirs'
+    list, in which case it is fetched once and written (or hard-linked) into
+    each of those directories.
+
+    `on_status(message, level)` and `on_progress(percent)` are called from
+    worker threads; callers that drive a GUI must marshal them to their own
+    main thread.
+    """
+
+    def __init__(self, output_dir, max_workers=DEFAULT_MAX_WORKERS, languages=None,
+                 prefer_manual=True, only_preferred=False, translate_to=None,
+                 bypass_cache=False, sync_mode=False, output_format=DEFAULT_FORMAT, naming=DEFAULT_NAMING,
+                 archive=False, dedupe=True, merge=DEFAULT_MERGE, chunk_seconds=None, chunk_words=None,
+                 index_path=None, use_fallback=True, proxies=None, pool_size=None,
+                 cache_path=DEFAULT_CACHE_PATH, use_journal=True, resume=False, metrics=None, profiler=None,
+                 requests_per_second=DEFAULT_REQUESTS_PER_SECOND, on_status=None, on_progress=None):
+        self.output_dir = output_dir
+        self.max_workers = max(1, int(max_workers))
+        self.languages = list(languages or PREFERRED_LANGUAGES)
+        self.resolver = LanguageResolver(
+            self.languages, prefer_manual=prefer_manual, fallback_to_any=not only_preferred,
+            translate_to=translate_to)
+        self.bypass_cache = bypass_cache
+        self.sync_mode = sync_mode
+        self.output_format = output_format
+        self.naming = naming
+        self.archive = archive
+        self.dedupe = dedupe
+        self.merge = merge
+        self.chunk_seconds = chunk_seconds
+        self.chunk_words = chunk_words
+        self.extension = file_extension(output_format)
+        self.index_path = index_path
+        self.use_fallback = use_fallback
+        self.proxies = proxies
+        self.pool_size = pool_size or max(DEFAULT_POOL_SIZE, self.max_workers)
+        self.cache_path = cache_path
+        self.use_journal = use_journal
+        self.resume = resume
+        self.profiler = profiler
+        self.requests_per_second = requests_per_second
+        self.on_status = on_status
+        self.on_progress = on_progress
+
+        self.rate_limiter = None
+        self.fallback_limiter = None
+        self.primary_throttled_until = 0.0
+        self._failover_lock = threading.Lock()
+        self.connections = None
+        self.cache = None
+        self.search_index = None
+        self.journal = None
+        self.metrics = metrics or Metrics()
+        self.manifests = {}
+        self.filename_registries = {}
+        self.archives = {}
+        self._manifests_lock = threading.Lock()
+        # Guards submitting against cancel(); reentrant because Ctrl+C can land while it is held
+        self._submit_lock = threading.RLock()
+        self._cancelled = threading.Event()
+        self._executor = None
+
+    def cancel(self):
+        """Stop a running job: queued videos are dropped, ones already being fetched finish.
+
+        Safe to call from any thread. Dropped videos stay pending in the
+        journal, so a resume picks them up.
+        """
+        with self._submit_lock:
+            self._cancelled.set()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _status(self, message, level=STATUS_INFO):
+        if self.on_status:
+            self.on_status(message, level)
+
+    def _progress(self, value):
+        if self.on_progress:
+            self.on_progress(value)
+
+    def _output_dirs(self, video):
+        return video.get('output_dirs') or [self.output_dir]
+
+    def _manifest(self, directory):
+        with self._manifests_lock:
+            if directory not in self.manifests:
+                self.manifests[directory] = SyncManifest(directory)
+            return self.manifests[directory]
+
+    def _archive(self, directory):
+        with self._manifests_lock:
+            if directory not in self.archives:
+                self.archives[directory] = TranscriptArchive(os.path.join(directory, ARCHIVE_FILENAME))
+            return self.archives[directory]
+
+    def _output_exists(self, directory):
+        """exists() check for SyncManifest: archive entries in archive mode, plain files otherwise"""
+        if self.archive:
+            return self._archive(directory).has_file
+        return None
+
+    def _filenames(self, video, position):
+        """Claim a file name for the video in each of its output directories.
+
+        Called in playlist order from the submitting thread, so which of two
+        same-titled videos keeps the plain title does not depend on worker timing.
+        """
+        candidates = candidate_names(video, self.naming, position)
+        filenames = {}
+        for directory in self._output_dirs(video):
+            manifest = self._manifest(directory)
+            with self._manifests_lock:
+                registry = self.filename_registries.get(directory)
+                if registry is None:
+                    # Names given out by earlier runs stay with their videos
+                    registry = FilenameRegistry({
+                        entry['filename']: video_id for video_id, entry in manifest.entries.items()
+                    })
+                    self.filename_registries[directory] = registry
+            filenames[directory] = registry.claim(video['id'], candidates, self.extension)
+        return filenames
+
+    def job_options(self):
+        """The options that decide what a job produces, kept in the journal so a resume repeats them"""
+        return {
+            'languages': self.languages,
+            'prefer_manual': self.resolver.prefer_manual,
+            'only_preferred': not self.resolver.fallback_to_any,
+            'translate_to': self.resolver.translate_to,
+            'sync_mode': self.sync_mode,
+            'output_format': self.output_format,
+            'naming': self.naming,
+            'archive': self.archive,
+            'dedupe': self.dedupe,
+            'merge': self.merge,
+            'chunk_seconds': self.chunk_seconds,
+            'chunk_words': self.chunk_words,
+            'index_path': self.index_path,
+            'use_fallback': self.use_fallback,
+        }
+
+    def output_options(self):
+        """The subset of job_options() recorded with every manifest entry"""
+        options = self.job_options()
+        return {key: options[key] for key in OUTPUT_OPTIONS}
+
+    def _make_connections(self):
+        """The pool every worker takes its HTTP session, transcript API and YoutubeDL from"""
+        return ConnectionPool(pool_size=self.pool_size, proxies=self.proxies)
+
+    def _open_journal(self):
+        if not self.use_journal:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        journal = JobJournal(self.output_dir)
+        if self.resume:
+            journal.resume()
+        else:
+            journal.start(self.job_options())
+        return journal
+
+    def _is_current(self, video):
+        return all(
+            self._manifest(directory).is_current(
+                video, self.extension, self.output_options(), exists=self._output_exists(directory))
+            for directory in self._output_dirs(video)
+        )
+
+    def run(self, videos):
+        """Fetch transcripts for `videos` and return a summary dict.
+
+        `videos` may be any iterable, including a PlaylistStream; work on each
+        video starts as soon as it is yielded.
+        """
+        started = time.time()
+        known_total = len(videos) if hasattr(videos, '__len__') else None
+        self.rate_limiter = RateLimiter(
+            requests_per_second=self.requests_per_second,
+            backoff=BackoffPolicy(max_attempts=MAX_RETRY_ATTEMPTS)
+        )
+        # The yt-dlp backend hits different endpoints, so it gets its own budget
+        self.fallback_limiter = RateLimiter(requests_per_second=self.requests_per_second)
+        self.primary_throttled_until = 0.0
+        self.connections = self._make_connections()
+        self.cache = TranscriptCache(path=self.cache_path, bypass=self.bypass_cache)
+        self.search_index = SearchIndex(self.index_path) if self.index_path else None
+        self.journal = self._open_journal()
+        self.manifests = {}
+        self.filename_registries = {}
+        self.archives = {}
+        self._cancelled.clear()
+
+        seen = 0
+        up_to_date = 0
+        submitted = 0
+        completed = 0
+        cancelled = 0
+        successful_downloads = 0
+        failed_video_details = []
+        enumeration_error = None
+        finished = queue.Queue()
+
+        def collect(future):
+            nonlocal completed, cancelled, successful_downloads
+            video_serial_number, video = futures.pop(future)
+            completed += 1
+            if future.cancelled():
+                cancelled += 1
+                return
+            self._progress((completed / (known_total or submitted)) * 100)
+
+            error = future.result()
+            if error is None:
+                successful_downloads += 1
+                self.metrics.increment('videos_succeeded')
+            else:
+                self.metrics.increment('videos_failed')
+                failed_video_details.append({
+                    'index': video_serial_number,
+                    'id': video['id'],
+                    'title': video['title'],
+                    'error': str(error),
+                    'error_class': classify_error(error),
+                })
+                if self.journal is not None:
+                    failed_video_details[-1]['attempts'] = self.journal.attempts(video['id'])
+
+        try:
+            if known_total is not None:
+                self._status(
+                    f"Fetching transcripts for {known_total} videos with {self.max_workers} workers...",
+                    STATUS_WORKING)
+            else:
+                self._status(f"Fetching transcripts with {self.max_workers} workers...", STATUS_WORKING)
+
+            futures = {}
+            initializer = self.profiler.enable_thread if self.profiler else None
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="transcript",
+                                    initializer=initializer) as executor:
+                self._executor = executor
+                try:
+                    try:
+                        for video in videos:
+                            if self._cancelled.is_set():
+                                break
+                            seen += 1
+                            if self.sync_mode and self._is_current(video):
+                                up_to_date += 1
+                                self.metrics.increment('videos_up_to_date')
+                                if self.journal is not None:
+                                    self.journal.done(video)
+                                continue
+
+                            if self.journal is not None:
+                                self.journal.pending(video)
+                            filenames = self._filenames(video, seen)
+                            with self._submit_lock:
+                                if self._cancelled.is_set():
+                                    break
+                                future = executor.submit(self._fetch_single_video, video, seen,
+                                                         known_total or "?", filenames)
+                            submitted += 1
+                            futures[future] = (seen, video)
+                            future.add_done_callback(finished.put)
+
+                            # Account for finished work while the source is still producing videos
+                            while not finished.empty():
+                                collect(finished.get())
+                    except Exception as e:
+                        # Keep whatever was already queued; report the truncated listing
+                        logger.warning("Stopped reading videos after %d: %s", seen, e)
+                        enumeration_error = str(e)
+                        self._status(f"Could not read the full playlist: {e}", STATUS_WARNING)
+
+                    while completed < submitted:
+                        collect(finished.get())
+                except BaseException:
+                    # Ctrl+C or a closing app: drop the queue rather than work through it before exiting
+                    self.cancel()
+                    raise
+        finally:
+            self._executor = None
+            self.cache.close()
+            self.connections.close()
+            if self.search_index is not None:
+                self.search_index.close()
+            # Archives first: their final batch commits 'done' journal entries
+            for archive in self.archives.values():
+                archive.close()
+            if self.journal is not None:
+                self.journal.close()
+            for manifest in self.manifests.values():
+                manifest.save()
+
+        failed_video_details.sort(key=lambda detail: detail['index'])
+        return {
+            'output_dir': self.output_dir,
+            'total': seen,
+            'fetched': submitted,
+            'successful': successful_downloads,
+            'failed': len(failed_video_details),
+            'up_to_date': up_to_date,
+            'cancelled': cancelled,
+            'failed_videos': failed_video_details,
+            'enumeration_error': enumeration_error,
+            'elapsed_seconds': round(time.time() - started, 3),
+            'metrics': self.metrics.snapshot(),
+        }
+
+    def _load_cached_transcript(self, video_id):
+        """Return (segments, language_code, track key) from the cache without any network call.
+
+        The cached listing is resolved exactly as a download would be, and the
+        key names the track kind and any translation, so a hit is always the
+        track a fresh download would fetch.
+        """
+        listing = self.cache.get_listing(video_id)
+        if not listing:
+            return None, None, None
+        try:
+            _, language_code, key, _ = self.resolver.resolve(listing)
+        except NoMatchingTranscript:
+            return None, None, None
+        segments = self.cache.get_transcript(video_id, key)
+        if segments:
+            return segments, language_code, key
+        return None, None, None
+
+    def _download_transcript(self, video):
+        """Fetch a transcript over the network, failing over to yt-dlp while the primary API is throttled.
+
+        Returns (segments, language_code, track key, limiter), where `limiter`
+        is the rate limiter of the backend that served the transcript.
+        """
+        if not self.use_fallback:
+            return self._download_with_transcript_api(video) + (self.rate_limiter,)
+
+        if time.monotonic() >= self.primary_throttled_until:
+            try:
+                return self._download_with_transcript_api(video) + (self.rate_limiter,)
+            except Exception as e:
+                if classify_error(e) != THROTTLED:
+                    raise
+                with self._failover_lock:
+                    # Only the first of the workers throttled together slows the primary backend down
+                    # and moves on to the next proxy
+                    if time.monotonic() >= self.primary_throttled_until:
+                        self.rate_limiter.record_throttle(1)
+                        self.connections.rotate()
+                    self.primary_throttled_until = time.monotonic() + FAILOVER_COOLDOWN
+                self.metrics.increment('failovers')
+                logger.warning("youtube_transcript_api throttled, switching to yt-dlp for %ds: %s",
+                               FAILOVER_COOLDOWN, e, extra={'video_id': video['id']})
+                self._status("Transcript API throttled, using yt-dlp subtitles instead", STATUS_WARNING)
+
+        self.metrics.increment('yt_dlp_requests')
+        with self.metrics.timer('yt_dlp'):
+            transcript_data, fetched_lang_code, key = get_transcript_with_yt_dlp(
+                video['id'], self.languages, self.fallback_limiter, self.connections.youtube_dl(), self.resolver,
+                self.cache)
+        logger.info("Fetched %s subtitles via yt-dlp for %s", fetched_lang_code, video['title'],
+                    extra={'video_id': video['id']})
+        self.cache.put_transcript(video['id'], key, transcript_data)
+        return transcript_data, fetched_lang_code, key, self.fallback_limiter
+
+    def _download_with_transcript_api(self, video):
+        """List the tracks once, pick one with the language resolver and fetch only that one"""
+        rate_limiter = self.rate_limiter
+        transcript_api = self.connections.transcript_api()
+
+        with self.metrics.timer('rate_limit_wait'):
+            rate_limiter.acquire()
+        self.metrics.increment('transcript_api_requests')
+        with self.metrics.timer('list'):
+            transcript_list = transcript_api.list(video['id'])
+        self.cache.put_listing(video['id'], describe_tracks(transcript_list))
+
+        transcript, fetched_lang_code, key, decisions = self.resolver.resolve(transcript_list)
+        for decision in decisions:
+            logger.debug("%s track %s", video['id'], decision, extra={'video_id': video['id']})
+
+        with self.metrics.timer('rate_limit_wait'):
+            rate_limiter.acquire()
+        self.metrics.increment('transcript_api_requests')
+        with self.metrics.timer('fetch'):
+            transcript_data = normalize_segments(transcript.fetch())
+        logger.info("Fetched %s transcript for %s", fetched_lang_code, video['title'],
+                    extra={'video_id': video['id']})
+        if transcript_data:
+            self.cache.put_transcript(video['id'], key, transcript_data)
+        return transcript_data, fetched_lang_code, key
+
+    def _fetch_single_video(self, video, video_serial_number, total_videos, filenames):
+        """Fetch, format and save one transcript with retries; returns None or the last error"""
+        rate_limiter = self.rate_limiter
+        last_exception = None
+        max_attempts = rate_limiter.backoff.max_attempts
+        started = time.perf_counter()
+        log_fields = {'video_id': video['id']}
+
+        for attempt in range(1, max_attempts + 1):
+            try:
+                status_message = f"Processing ({video_serial_number}/{total_videos}): {video['title'][:40]}..."
+                if attempt > 1:
+                    status_message += f" (Attempt {attempt})"
+                self._status(status_message, STATUS_WORKING)
+
+                # Cache hits count towards the primary backend's recovery, as they always have
+                served_by = rate_limiter
+                with self.metrics.timer('cache_lookup'):
+                    transcript_data, fetched_lang_code, key = self._load_cached_transcript(video['id'])
+                if transcript_data:
+                    self.metrics.increment('cache_hits')
+                    logger.info("Using cached %s transcript for %s", fetched_lang_code, video['title'],
+                                extra=log_fields)
+                else:
+                    self.metrics.increment('cache_misses')
+                    transcript_data, fetched_lang_code, key, served_by = self._download_transcript(video)
+
+                if not transcript_data:
+                    raise Exception("No transcript data retrieved")
+
+                # The cache keeps raw captions; clean-up happens per run so its options can change.
+                # Only auto-generated tracks roll, so manual captions are never deduplicated.
+                with self.metrics.timer('postprocess'):
+                    segments = postprocess_segments(
+                        transcript_data, self.dedupe and is_generated_key(key), self.merge,
+                        self.chunk_seconds, self.chunk_words)
+                self.metrics.increment('segments_in', len(transcript_data))
+                self.metrics.increment('segments_out', len(segments))
+
+                digest = content_hash(video['title'], fetched_lang_code, segments, self.output_format)
+
+                written_path = None
+                # In archive mode the journal only marks the video done once its batch is committed
+                mark_done = None
+                if self.journal is not None:
+                    mark_done = functools.partial(self.journal.done, video, attempt)
+                for directory, filename in filenames.items():
+                    manifest = self._manifest(directory)
+                    filepath = os.path.join(directory, filename)
+
+                    if self.sync_mode and manifest.is_unchanged(
+                            video['id'], filename, digest, self.output_options(),
+                            exists=self._output_exists(directory)):
+                        logger.info("Transcript unchanged, keeping existing file %s", filepath, extra=log_fields)
+                    elif self.archive:
+                        with self.metrics.timer('write'):
+                            self._archive(directory).add(
+                                video, filename, fetched_lang_code, self.output_format,
+                                iter_transcript(segments, video, self.output_format), on_commit=mark_done)
+                        mark_done = None
+                    elif written_path is None:
+                        # Format and save, streaming chunks straight to the file
+                        with self.metrics.timer('write'):
+                            write_transcript(filepath, segments, video, self.output_format)
+                        written_path = filepath
+                    else:
+                        # Same video in another playlist: reuse the file we just wrote
+                        link_or_copy(written_path, filepath)
+
+                    manifest.record(video, filename, fetched_lang_code, digest, self.output_options())
+
+                if self.search_index is not None:
+                    with self.metrics.timer('index'):
+                        self.search_index.add_transcript(video, segments, fetched_lang_code)
+                served_by.record_success()
+                if mark_done is not None:
+                    mark_done()
+                self.metrics.observe('video', time.perf_counter() - started)
+                return None
+
+            except Exception as e:
+                last_exception = e
+                error_class = classify_error(e)
+                logger.warning("Attempt %d failed for %s (%s): %s", attempt, video['title'], error_class, e,
+                               extra=dict(log_fields, attempt=attempt, error_class=error_class))
+                if error_class == THROTTLED:
+                    self.metrics.increment('throttles')
+                if error_class == PERMANENT:
+                    logger.info("Not retrying %s: error is permanent", video['title'], extra=log_fields)
+                    break
+                if attempt < max_attempts:
+                    self.metrics.increment('retries')
+                    if error_class == THROTTLED:
+                        # With failover on, a primary throttle never gets here: the yt-dlp backend failed
+                        limiter = self.fallback_limiter if self.use_fallback else rate_limiter
+                        delay = limiter.record_throttle(attempt)
+                        self.connections.rotate()
+                        self._status(f"Throttled by YouTube, backing off {delay:.1f}s...", STATUS_WARNING)
+                        # Pauses every worker on that backend; this one waits out the pause here
+                        with self.metrics.timer('retry_sleep'):
+                            time.sleep(delay)
+                    else:
+                        delay = rate_limiter.backoff.delay(attempt)
+                        self._status(f"Retrying {video['title'][:40]}... (Attempt {attempt+1})", STATUS_WARNING)
+                        with self.metrics.timer('retry_sleep'):
+                            time.sleep(delay)
+
+        logger.error("All retries failed for %s: %s", video['title'], last_exception, extra=log_fields)
+        self.metrics.observe('video', time.perf_counter() - started)
+        if self.journal is not None:
+            self.journal.failed(video, attempt, last_exception, classify_error(last_exception))
+        return last_exception
+
+
+def fetch_playlists(urls, output_dir, per_playlist_dirs=None,
+                    max_resolvers=DEFAULT_PLAYLIST_RESOLVERS, snapshots=None, only_changed=False,
+                    **fetcher_options):
+    """Resolve several playlists concurrently and fetch each distinct video only once.
+
+    With `per_playlist_dirs` (the default for more than one URL) every
+    playlist gets its own sub-directory of `output_dir`; videos shared by
+    several playlists are fetched once and linked into each directory.
+    Resolved playlists are saved to `snapshots` when given, and with
+    `only_changed` only videos added or renamed since the last fetch are
+    fetched. That baseline is only advanced once the run finishes, and failed
+    videos stay out of it, so they are offered again next time. Returns the
+    fetch summary extended with per-playlist details.
+    """
+    if per_playlist_dirs is None:
+        per_playlist_dirs = len(urls) > 1
+    on_status = fetcher_options.get('on_status')
+
+    if len(urls) == 1 and not per_playlist_dirs and snapshots is None:
+        # Nothing to deduplicate against, so fetch while the playlist is still paging in
+        try:
+            stream = PlaylistStream(urls[0])
+        except ValueError as e:
+            logger.warning("Could not load playlist %s: %s", urls[0], e)
+            # Nothing was queued, so keep the previous job's journal resumable
+            summary = TranscriptFetcher(output_dir, **dict(fetcher_options, use_journal=False)).run([])
+            summary.update({'playlist_entries': 0, 'duplicates_skipped': 0,
+                            'playlists': [{'url': urls[0], 'error': str(e)}]})
+            return summary
+
+        summary = TranscriptFetcher(output_dir, **fetcher_options).run(stream)
+        playlist = {
+            'url': stream.url,
+            'id': stream.id,
+            'title': stream.title,
+            'output_dir': output_dir,
+            'videos': stream.count,
+            'failed': summary['failed'],
+        }
+        if summary['enumeration_error']:
+            playlist['error'] = summary['enumeration_error']
+        summary.update({'playlist_entries': stream.count, 'duplicates_skipped': 0, 'playlists': [playlist]})
+        return summary
+
+    playlists = [{'url': url} for url in urls]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_resolvers, len(urls))),
+                            thread_name_prefix="playlist") as executor:
+        futures = {
+            executor.submit(load_playlist, url, snapshots, True): playlist
+            for url, playlist in zip(urls, playlists)
+        }
+        for future in as_completed(futures):
+            playlist = futures[future]
+            try:
+                result = future.result()
+                playlist.update(id=result['id'], title=result['title'], videos=result['videos'])
+            except Exception as e:
+                logger.warning("Could not load playlist %s: %s", playlist['url'], e)
+                playlist['error'] = str(e)
+
+    # One work item per distinct video, remembering every directory it belongs in
+    work_queue = {}
+    listings = {}
+    used_dirs = set()
+    total_entries = 0
+    for playlist in playlists:
+        if 'error' in playlist:
+            continue
+
+        directory = output_dir
+        if per_playlist_dirs:
+            folder = sanitize_filename(playlist['title']) or playlist['id']
+            if folder in used_dirs:
+                folder = f"{folder} [{playlist['id']}]"
+            used_dirs.add(folder)
+            directory = os.path.join(output_dir, folder)
+        os.makedirs(directory, exist_ok=True)
+        playlist['output_dir'] = directory
+
+        videos = playlist.pop('videos')
+        if snapshots is not None:
+            listings[playlist['id']] = videos
+            baseline = snapshots.baseline(playlist['id'])
+            changes = diff_playlists(baseline, videos) if baseline is not None else None
+            logger.info("%s: %s since the last fetch", playlist['title'], describe_changes(changes))
+            if only_changed and changes is not None:
+                wanted = changed_ids(changes)
+                videos = [video for video in videos if video['id'] in wanted]
+            playlist['changes'] = describe_changes(changes)
+
+        for video in videos:
+            total_entries += 1
+            item = work_queue.setdefault(video['id'], dict(video, output_dirs=[]))
+            if directory not in item['output_dirs']:
+                item['output_dirs'].append(directory)
+            playlist.setdefault('video_ids', []).append(video['id'])
+
+    if on_status:
+        on_status(
+            f"{len(work_queue)} distinct videos across {len(playlists)} playlists "
+            f"({total_entries - len(work_queue)} duplicates skipped)", STATUS_INFO)
+
+    if not work_queue:
+        # Nothing to queue, so keep the previous job's journal resumable
+        fetcher_options = dict(fetcher_options, use_journal=False)
+    summary = TranscriptFetcher(output_dir, **fetcher_options).run(list(work_queue.values()))
+
+    failed_ids = {detail['id'] for detail in summary['failed_videos']}
+    for playlist_id, videos in listings.items():
+        snapshots.save_baseline(playlist_id, videos, failed_ids)
+    for playlist in playlists:
+        video_ids = playlist.pop('video_ids', [])
+        if 'error' not in playlist:
+            playlist['videos'] = len(video_ids)
+            playlist['failed'] = sum(1 for video_id in video_ids if video_id in failed_ids)
+
+    summary.update({
+        'playlist_entries': total_entries,
+        'duplicates_skipped': total_entries - len(work_queue),
+        'playlists': playlists,
+    })
+    return summary
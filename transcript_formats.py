@@ -0,0 +1,114 @@
+"""Streaming transcript writers.
+
+Each format is a generator of text chunks, so a transcript is written to the
+file as it is formatted instead of being built up as one large string.
+Segments are the plain dicts produced by transcript_core.normalize_segments.
+"""
+import json
+import os
+import time
+
+DEFAULT_FORMAT = 'md'
+WRITE_BUFFER_SIZE = 64 * 1024
+
+
+def format_timestamp(seconds):
+    """HH:MM:SS timestamp used in the Markdown output, so videos over an hour read correctly"""
+    hours, seconds = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def format_cue_time(seconds, decimal_marker):
+    """HH:MM:SS,mmm (SRT) or HH:MM:SS.mmm (WebVTT) cue time"""
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{decimal_marker}{milliseconds:03d}"
+
+
+def iter_markdown(segments, video):
+    title = video['title']
+    yield (
+        f"# {title}\n\n"
+        f"**Video Title:** {title}\n\n"
+        f"**Transcript extracted on:** {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+        "---\n\n"
+    )
+    for segment in segments:
+        yield f"**[{format_timestamp(segment['start'])}]** {segment['text']}\n\n"
+
+
+def _iter_cues(segments, decimal_marker, numbered):
+    for number, segment in enumerate(segments, 1):
+        start = segment['start']
+        end = start + (segment.get('duration') or 0)
+        prefix = f"{number}\n" if numbered else ""
+        yield (
+            f"{prefix}{format_cue_time(start, decimal_marker)} --> "
+            f"{format_cue_time(end, decimal_marker)}\n{segment['text']}\n\n"
+        )
+
+
+def iter_srt(segments, video):
+    yield from _iter_cues(segments, ',', numbered=True)
+
+
+def iter_vtt(segments, video):
+    yield "WEBVTT\n\n"
+    yield from _iter_cues(segments, '.', numbered=False)
+
+
+def iter_jsonl(segments, video):
+    video_id = video.get('id', '')
+    for segment in segments:
+        yield json.dumps({
+            'video_id': video_id,
+            'start': segment['start'],
+            'duration': segment.get('duration', 0),
+            'text': segment['text'],
+        }, ensure_ascii=False) + "\n"
+
+
+def iter_text(segments, video):
+    for segment in segments:
+        yield segment['text'] + "\n"
+
+
+# format name -> (chunk generator, file extension)
+FORMATS = {
+    'md': (iter_markdown, '.md'),
+    'srt': (iter_srt, '.srt'),
+    'vtt': (iter_vtt, '.vtt'),
+    'jsonl': (iter_jsonl, '.jsonl'),
+    'txt': (iter_text, '.txt'),
+}
+
+
+def file_extension(output_format):
+    return FORMATS[output_format][1]
+
+
+def iter_transcript(segments, video, output_format=DEFAULT_FORMAT):
+    """Yield the formatted transcript in chunks"""
+    generator = FORMATS[output_format][0]
+    return generator(segments, video)
+
+
+def write_transcript(filepath, segments, video, output_format=DEFAULT_FORMAT):
+    """Format and write a transcript through a buffered file handle.
+
+    The file is written next to `filepath` and then moved over it, so a file
+    hard-linked into other folders is replaced here instead of rewritten
+    in place under every link.
+    """
+    tmp_path = filepath + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            f.writelines(iter_transcript(segments, video, output_format))
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
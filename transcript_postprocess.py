@@ -0,0 +1,102 @@
+"""Caption clean-up before formatting: rolling-duplicate removal and merging into sentences or paragraphs.
+
+Each stage is a generator over the plain segment dicts produced by
+transcript_core.normalize_segments, so a transcript passes through every
+stage in a single streaming pass and the output is still a list of
+{'text', 'start', 'duration'} dicts that every output format understands.
+"""
+import re
+
+MERGE_MODES = ('none', 'sentence', 'paragraph')
+DEFAULT_MERGE = 'none'
+# Default (seconds, words) limits of one merged chunk; words stand in for LLM tokens
+MERGE_LIMITS = {
+    'sentence': (15.0, 40),
+    'paragraph': (60.0, 150),
+}
+# Paragraphs close at the first sentence end past their limits, or here when none comes
+HARD_LIMIT_FACTOR = 1.5
+# Shorter overlaps between neighbouring captions are too often a coincidence ("of the")
+MIN_OVERLAP_WORDS = 3
+
+_SENTENCE_END = re.compile(r'[.!?…。！？]["\'”’)\]]*$')
+
+
+def _overlap(previous, words):
+    """Number of leading `words` that repeat the end of the previous caption, or 0"""
+    for size in range(min(len(previous), len(words)), MIN_OVERLAP_WORDS - 1, -1):
+        if previous[-size:] == words[:size]:
+            return size
+    return 0
+
+
+def dedupe_segments(segments):
+    """Drop empty and repeated captions and strip text a caption repeats from the one before.
+
+    Auto-generated tracks roll: each caption restates the tail of the
+    previous one before adding new words, so without this the same words
+    appear two or three times in a row. Repeats shorter than
+    MIN_OVERLAP_WORDS are kept, as they are as likely to be real speech.
+    Meant for auto-generated tracks only; manual captions do not roll.
+    """
+    previous = []
+    for segment in segments:
+        words = segment['text'].split()
+        overlap = _overlap(previous, words)
+        previous = words
+        if overlap == len(words):
+            continue
+        if overlap:
+            segment = dict(segment, text=' '.join(words[overlap:]))
+        yield segment
+
+
+def merge_segments(segments, mode=DEFAULT_MERGE, max_seconds=None, max_words=None):
+    """Join consecutive captions into sentence or paragraph chunks.
+
+    'sentence' closes a chunk at every sentence end, 'paragraph' at the
+    first sentence end once the chunk spans `max_seconds` or holds
+    `max_words` words. Unpunctuated auto-generated text is cut at the limits
+    (times HARD_LIMIT_FACTOR for paragraphs). 'none' passes segments through.
+    """
+    if mode == 'none':
+        yield from segments
+        return
+
+    default_seconds, default_words = MERGE_LIMITS[mode]
+    max_seconds = max_seconds or default_seconds
+    max_words = max_words or default_words
+    factor = HARD_LIMIT_FACTOR if mode == 'paragraph' else 1
+
+    words = []
+    start = end = None
+    for segment in segments:
+        text = segment['text']
+        segment_words = text.split()
+        if not segment_words:
+            continue
+        if start is None:
+            start = segment['start']
+            end = start
+        words.extend(segment_words)
+        end = max(end, segment['start'] + (segment.get('duration') or 0))
+
+        seconds = end - start
+        if _SENTENCE_END.search(text.rstrip()):
+            close = mode == 'sentence' or seconds >= max_seconds or len(words) >= max_words
+        else:
+            close = seconds >= max_seconds * factor or len(words) >= max_words * factor
+        if close:
+            yield {'text': ' '.join(words), 'start': start, 'duration': end - start}
+            words = []
+            start = None
+
+    if words:
+        yield {'text': ' '.join(words), 'start': start, 'duration': end - start}
+
+
+def postprocess_segments(segments, dedupe=True, merge=DEFAULT_MERGE, max_seconds=None, max_words=None):
+    """Run the enabled stages and return the resulting segments as a list"""
+    if dedupe:
+        segments = dedupe_segments(segments)
+    return list(merge_segments(segments, merge, max_seconds, max_words))